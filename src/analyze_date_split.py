@@ -1,11 +1,20 @@
 
 import os
-import json
+import sys
+import hashlib
+import orjson
 import random
 from typing import List, Dict, Any
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.jsonl import iter_lines
 
 TARGET_DATE = datetime(2025, 3, 20)
+SAMPLE_SIZE = 5
 BASE_DIR = r"c:\Users\maudi\OneDrive\문서\test\naver_pension_crawler\GPR_2025_HQ\run_20260101_161400"
 
 def parse_korean_date(date_str: str) -> datetime:
@@ -27,72 +36,119 @@ def parse_korean_date(date_str: str) -> datetime:
         pass
     return None
 
+def url_key(url: str) -> int:
+    """64-bit digest of a URL; keeps the article map free of full URL strings."""
+    return int.from_bytes(hashlib.blake2b(url.encode("utf-8"), digest_size=8).digest(), "little")
+
+def reservoir_push(reservoir: List[Any], item: Any, seen: int, k: int = SAMPLE_SIZE):
+    """Algorithm R: keep a uniform sample of k items; `seen` counts items so far, including this one."""
+    if len(reservoir) < k:
+        reservoir.append(item)
+    else:
+        j = random.randrange(seen)
+        if j < k:
+            reservoir[j] = item
+
+def list_batch_files(base_dir: str):
+    """Single directory pass that splits batch files into (articles, comments) paths."""
+    article_files, comment_files = [], []
+    with os.scandir(base_dir) as it:
+        for entry in it:
+            name = entry.name
+            if not name.endswith(".jsonl"):
+                continue
+            if name.startswith("articles_batch"):
+                article_files.append(entry.path)
+            elif name.startswith("comments_batch"):
+                comment_files.append(entry.path)
+    return article_files, comment_files
+
+def scan_article_file(path: str):
+    """
+    Buckets one articles batch file. Runs in a worker process.
+    Returns (url_key -> is_pre map, pre count, post count, error or None).
+    """
+    local_map: Dict[int, bool] = {}
+    pre, post = 0, 0
+    try:
+        for line in iter_lines(path):
+            if not line.strip():
+                continue
+            data = orjson.loads(line)
+            url = data.get("url")
+            date_str = data.get("published_at", "")
+
+            dt = parse_korean_date(date_str)
+            if dt and url:
+                is_pre = dt < TARGET_DATE
+                local_map[url_key(url)] = is_pre
+                if is_pre:
+                    pre += 1
+                else:
+                    post += 1
+    except Exception as e:
+        return local_map, pre, post, str(e)
+    return local_map, pre, post, None
+
 def analyze():
-    articles_pre = []
-    articles_post = []
+    articles_pre = 0
+    articles_post = 0
+    article_files, comment_files = list_batch_files(BASE_DIR)
     
     # 1. Load Articles
     print("Loading articles...")
-    article_map = {} # url -> date_bucket
+    article_map: Dict[int, bool] = {} # url_key -> True if PRE, False if POST
     
-    for filename in os.listdir(BASE_DIR):
-        if filename.startswith("articles_batch") and filename.endswith(".jsonl"):
-            path = os.path.join(BASE_DIR, filename)
-            try:
-                with open(path, "r", encoding="utf-8") as f:
-                    for line in f:
-                        data = json.loads(line)
-                        url = data.get("url")
-                        date_str = data.get("published_at", "")
-                        
-                        dt = parse_korean_date(date_str)
-                        if dt:
-                            if dt < TARGET_DATE:
-                                articles_pre.append(data)
-                                article_map[url] = "PRE"
-                            else:
-                                articles_post.append(data)
-                                article_map[url] = "POST"
-            except Exception as e:
-                print(f"Error reading {filename}: {e}")
-
-    print(f"Articles Pre-3/20: {len(articles_pre)}")
-    print(f"Articles Post-3/20: {len(articles_post)}")
+    # Files are independent, so parse them in parallel; map() keeps file order for merging
+    with ProcessPoolExecutor() as executor:
+        for path, (local_map, pre, post, error) in zip(article_files, executor.map(scan_article_file, article_files)):
+            article_map.update(local_map)
+            articles_pre += pre
+            articles_post += post
+            if error:
+                print(f"Error reading {os.path.basename(path)}: {error}")
+
+    print(f"Articles Pre-3/20: {articles_pre}")
+    print(f"Articles Post-3/20: {articles_post}")
 
     # 2. Load Comments
     print("Loading comments...")
-    comments_pre = []
-    comments_post = []
+    # Only counts + a fixed-size sample are kept, not every comment
+    comments_pre, comments_post = 0, 0
+    sample_pre, sample_post = [], []
     
-    for filename in os.listdir(BASE_DIR):
-        if filename.startswith("comments_batch") and filename.endswith(".jsonl"):
-            path = os.path.join(BASE_DIR, filename)
-            try:
-                with open(path, "r", encoding="utf-8") as f:
-                    for line in f:
-                        data = json.loads(line)
-                        url = data.get("article_url") # or check how it's linked
-                        # If url not in data, try 'url' field if it exists in schema
-                        
-                        bucket = article_map.get(url)
-                        if bucket == "PRE":
-                            comments_pre.append(data.get("contents", ""))
-                        elif bucket == "POST":
-                            comments_post.append(data.get("contents", ""))
-            except Exception as e:
-                print(f"Error reading {filename}: {e}")
-
-    print(f"Comments Pre-3/20: {len(comments_pre)}")
-    print(f"Comments Post-3/20: {len(comments_post)}")
+    for path in comment_files:
+        filename = os.path.basename(path)
+        try:
+            for line in iter_lines(path):
+                if not line.strip():
+                    continue
+                data = orjson.loads(line)
+                url = data.get("article_url") # or check how it's linked
+                # If url not in data, try 'url' field if it exists in schema
+
+                if not url:
+                    continue
+                is_pre = article_map.get(url_key(url))
+                if is_pre is True:
+                    comments_pre += 1
+                    reservoir_push(sample_pre, data.get("contents", ""), comments_pre)
+                elif is_pre is False:
+                    comments_post += 1
+                    reservoir_push(sample_post, data.get("contents", ""), comments_post)
+        except Exception as e:
+            print(f"Error reading {filename}: {e}")
+
+    print(f"Comments Pre-3/20: {comments_pre}")
+    print(f"Comments Post-3/20: {comments_post}")
     
-    # 3. Sample
-    sample_size = 5
+    # 3. Sample (collected by reservoir sampling during the pass)
     print("\n--- SAMPLE PRE-3/20 ---")
-    for c in random.sample(comments_pre, min(len(comments_pre), sample_size)):
+    for c in sample_pre:
         print(f"- {c[:100]}...")
 
     print("\n--- SAMPLE POST-3/20 ---")
-    for c in random.sample(comments_post, min(len(comments_post), sample_size)):
+    for c in sample_post:
         print(f"- {c[:100]}...")
 
 if __name__ == "__main__":
@@ -1,18 +1,99 @@
-import json
+import orjson
 import os
-import glob
+import sys
 from datetime import datetime
 from tqdm import tqdm
-from transformers import pipeline
+from transformers import pipeline, AutoTokenizer
 import torch
 
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.jsonl import iter_lines, latest_jsonl
+
+MODEL_NAME = "jaehyeong/koelectra-base-v3-generalized-sentiment-analysis"
+# Optional ONNX export, used when present. Build it once with optimum:
+#   optimum-cli export onnx --model jaehyeong/koelectra-base-v3-generalized-sentiment-analysis --optimize O2 models/koelectra_onnx
+#   optimum-cli onnxruntime quantize --onnx_model models/koelectra_onnx --avx512_vnni -o models/koelectra_onnx_int8
+ONNX_MODEL_DIR = os.path.join("models", "koelectra_onnx")          # fp32/fp16 graph (GPU)
+ONNX_INT8_MODEL_DIR = os.path.join("models", "koelectra_onnx_int8")  # quantized graph (CPU)
+BATCH_SIZE = 64
+NUM_WORKERS = 2
+# Rows are length-sorted within windows of this size so each batch pads to similar lengths
+SORT_WINDOW = BATCH_SIZE * 64
+PROGRESS_EVERY = 1000  # lines between progress bar updates
+
+def iter_comments(path, log_errors=True, pbar=None):
+    """Yields (data, content) for every parseable line; content is '' when the comment has no text."""
+    pending_bytes = 0
+    for n, line in enumerate(iter_lines(path), 1):
+        if pbar is not None:
+            pending_bytes += len(line) + 1  # + newline
+            if n % PROGRESS_EVERY == 0:
+                pbar.update(pending_bytes)
+                pending_bytes = 0
+        if not line.strip():
+            continue
+        try:
+            data = orjson.loads(line)
+        except Exception as e:
+            if log_errors:
+                print(f"Error processing line: {e}")
+            continue
+        # content key is 'comment_text' in the saved json
+        content = data.get('comment_text', '') or data.get('contents', '')
+        yield data, content.strip()
+    if pbar is not None and pending_bytes:
+        pbar.update(pending_bytes)
+
+def iter_sorted_windows(path, log_errors=True, pbar=None):
+    """
+    Groups rows into windows of SORT_WINDOW and yields (rows, order), where order
+    lists the indices of rows with text sorted by text length. Deterministic, so the
+    dataset and the writer derive the same order independently.
+    """
+    rows = []
+    for row in iter_comments(path, log_errors=log_errors, pbar=pbar):
+        rows.append(row)
+        if len(rows) >= SORT_WINDOW:
+            yield rows, _length_order(rows)
+            rows = []
+    if rows:
+        yield rows, _length_order(rows)
+
+def _length_order(rows):
+    return sorted((i for i, (_, content) in enumerate(rows) if content), key=lambda i: len(rows[i][1]))
+
 def get_latest_comments_file(directory):
-    files = glob.glob(os.path.join(directory, "final_comments_*.jsonl"))
-    if not files:
-        return None
-    # Sort by modification time, newest first
-    files.sort(key=os.path.getmtime, reverse=True)
-    return files[0]
+    # Newest raw comments file; our own sentiment outputs share the prefix
+    return latest_jsonl(directory, "final_comments_", exclude="sentiment")
+
+def load_sentiment_pipeline(device):
+    """
+    Builds the sentiment pipeline. Prefers an exported ONNX Runtime model
+    (INT8 on CPU, ONNX on GPU) when optimum is installed and the export exists;
+    otherwise falls back to the PyTorch model (fp16 on GPU).
+    """
+    onnx_dir = ONNX_MODEL_DIR if device == 0 else ONNX_INT8_MODEL_DIR
+    if os.path.isdir(onnx_dir):
+        try:
+            from optimum.onnxruntime import ORTModelForSequenceClassification
+        except ImportError:
+            print(f"Found {onnx_dir} but optimum[onnxruntime] is not installed; using PyTorch model.")
+        else:
+            provider = "CUDAExecutionProvider" if device == 0 else "CPUExecutionProvider"
+            print(f"Using ONNX Runtime model: {onnx_dir} ({provider})")
+            model = ORTModelForSequenceClassification.from_pretrained(onnx_dir, provider=provider)
+            tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
+            return pipeline("sentiment-analysis", model=model, tokenizer=tokenizer, device=device)
+
+    return pipeline(
+        "sentiment-analysis", 
+        model=MODEL_NAME,
+        device=device,
+        # Half precision halves memory bandwidth on GPU; CPU stays fp32
+        torch_dtype=torch.float16 if device == 0 else None
+    )
 
 def analyze_sentiment():
     input_dir = "GPR_FINAL"
@@ -35,56 +116,44 @@ def analyze_sentiment():
     print(f"Using device: {'GPU' if device == 0 else 'CPU'}")
     
     try:
-        sentiment_analyzer = pipeline(
-            "sentiment-analysis", 
-            model="jaehyeong/koelectra-base-v3-generalized-sentiment-analysis",
-            device=device
-        )
+        sentiment_analyzer = load_sentiment_pipeline(device)
     except Exception as e:
         print(f"Error loading model: {e}")
         return
 
-    total_lines = sum(1 for _ in open(input_file, 'r', encoding='utf-8'))
-    
-    print(f"Processing {total_lines} comments...")
+    # Progress is tracked in bytes so the file is not scanned once just to count lines
+    total_bytes = os.path.getsize(input_file)
     
-    with open(input_file, 'r', encoding='utf-8') as f_in, \
-         open(output_path, 'w', encoding='utf-8') as f_out:
-        
-        for line in tqdm(f_in, total=total_lines):
-            if not line.strip():
-                continue
-                
-            try:
-                data = json.loads(line)
-                # content key is 'comment_text' in the saved json
-                content = data.get('comment_text', '') or data.get('contents', '')
-                content = content.strip()
-                
-                if content:
-                    # Truncate if too long (model limit usually 512 tokens, safe bet ~1000 chars)
-                    # The pipeline handles truncation but explicitly shortening can save time/errors
-                    truncated_content = content[:512] 
-                    
-                    result = sentiment_analyzer(truncated_content)[0]
-                    # Result is like {'label': 'positive', 'score': 0.99} or numbers
-                    # monologg model outputs labels: '0' (negative), '1' (positive) usually, let's verify map
-                    
-                    # Map labels if necessary (standard nsmc models uses 'negative'/'positive' or '0'/'1')
-                    label = result['label']
-                    score = result['score']
-                    
-                    data['sentiment_label'] = label
-                    data['sentiment_score'] = score
-                else:
-                    data['sentiment_label'] = None
-                    data['sentiment_score'] = None
-                    
-                f_out.write(json.dumps(data, ensure_ascii=False) + '\n')
-                
-            except Exception as e:
-                print(f"Error processing line: {e}")
-                continue
+    print(f"Processing {total_bytes:,} bytes of comments...")
+
+    # Worker processes are cheap with fork; on Windows spawn cost outweighs the gain
+    num_workers = NUM_WORKERS if sys.platform.startswith("linux") else 0
+
+    # Single pass over the input: each window is read once, classified, then written.
+    # The pipeline's DataLoader tokenizes the window's texts ahead while the model runs;
+    # results come back in input order, i.e. the window's length order.
+    with open(output_path, 'wb') as f_out, \
+         tqdm(total=total_bytes, unit='B', unit_scale=True, mininterval=0.5) as pbar:
+        for rows, order in iter_sorted_windows(input_file, pbar=pbar):
+            for data, _ in rows:
+                data['sentiment_label'] = None
+                data['sentiment_score'] = None
+            if order:
+                results = sentiment_analyzer(
+                    [rows[i][1] for i in order],
+                    batch_size=BATCH_SIZE,
+                    num_workers=num_workers,
+                    truncation=True,
+                    max_length=512
+                )
+                for i, result in zip(order, results):
+                    # Result is like {'label': 'positive', 'score': 0.99}
+                    data = rows[i][0]
+                    data['sentiment_label'] = result['label']
+                    data['sentiment_score'] = result['score']
+            
+            # Written back in original file order, one writelines per window
+            f_out.writelines([orjson.dumps(data) + b'\n' for data, _ in rows])
                 
     print(f"Sentiment analysis completed. Saved to {output_path}")
 
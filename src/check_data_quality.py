@@ -1,35 +1,65 @@
-import json
+import orjson
 import os
-import glob
+import re
+import sys
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.jsonl import iter_lines, latest_jsonl
+
+# First character of a "contents" value (not an escaped \"contents\" inside text)
+CONTENTS_RE = re.compile(rb'(?<!\\)"contents"\s*:\s*"(.)')
+EMPTY_CHAR = ord('"')
+
+def _is_top_level(line, pos):
+    """True if the only container opened before pos is the record's own '{' (no nesting, no arrays)."""
+    head = line[:pos]
+    first = head.find(b'{')
+    return first != -1 and head.find(b'{', first + 1) == -1 and b'[' not in head
+
+def classify_contents(line):
+    """
+    Returns True if 'contents' is empty/blank, False if not, None if the line is unreadable.
+    For well-formed records it answers like `not orjson.loads(line).get('contents', '').strip()`.
+    The byte-level fast path only decides lines with a single, top-level "contents" whose
+    value is empty or starts with a printable ASCII char; everything else (whitespace,
+    escapes, non-ASCII such as U+3000, nested or repeated keys) goes through orjson.
+    """
+    m = CONTENTS_RE.search(line)
+    if m and line.count(b'"contents"') == 1 and _is_top_level(line, m.start()):
+        first = m.group(1)[0]
+        if first == EMPTY_CHAR:
+            return True
+        # Printable ASCII other than '\\' cannot be stripped away
+        if 0x21 <= first <= 0x7e and first != 0x5c:
+            return False
+    try:
+        return not orjson.loads(line).get('contents', '').strip()
+    except (orjson.JSONDecodeError, AttributeError):
+        return None
 
 def check_data():
-    files = glob.glob(os.path.join("GPR_FINAL", "final_comments_*.jsonl"))
-    # Filter out sentiment files
-    files = [f for f in files if "sentiment" not in f]
-    files.sort(key=os.path.getmtime, reverse=True)
+    # Newest comments file, excluding sentiment outputs
+    target = latest_jsonl("GPR_FINAL", "final_comments_", exclude="sentiment")
     
-    if not files:
+    if not target:
         print("No input file found")
         return
 
-    target = files[0]
     print(f"Checking {target}")
     
     total = 0
     empty = 0
     non_empty = 0
     
-    with open(target, 'r', encoding='utf-8') as f:
-        for line in f:
-            total += 1
-            try:
-                data = json.loads(line)
-                if not data.get('contents', '').strip():
-                    empty += 1
-                else:
-                    non_empty += 1
-            except:
-                pass
+    for line in iter_lines(target):
+        total += 1
+        is_empty = classify_contents(line)
+        if is_empty is True:
+            empty += 1
+        elif is_empty is False:
+            non_empty += 1
                 
     print(f"Total: {total}")
     print(f"Empty contents: {empty}")
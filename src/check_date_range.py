@@ -1,14 +1,26 @@
 
-import json
+import orjson
 import os
 import glob
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 import re
 import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.jsonl import iter_lines
 
 # Ensure UTF-8 output for Windows console
 sys.stdout.reconfigure(encoding='utf-8')
 
+ABS_DATE_RE = re.compile(r"\d{4}\.\d{2}\.\d{2}")
+NUM_RE = re.compile(r"(\d+)")
+# Relative suffix -> timedelta unit, checked in this order. None => same day.
+RELATIVE_UNITS = (("분 전", None), ("시간 전", "hours"), ("일 전", "days"), ("주 전", "weeks"))
+
 def parse_relative_date(date_str, collected_at):
     """
     Parses relative dates like '1시간 전', '2일 전' into YYYY-MM-DD.
@@ -19,41 +31,61 @@ def parse_relative_date(date_str, collected_at):
 
     try:
         # 1. Absolute Date (YYYY.MM.DD)
-        if re.match(r"\d{4}\.\d{2}\.\d{2}", date_str):
-            return datetime.strptime(date_str.split(" ")[0], "%Y.%m.%d").date()
+        if ABS_DATE_RE.match(date_str):
+            token = date_str.split(" ")[0]
+            # Slice only the exact 'YYYY.MM.DD' shape; anything else ('YYYY.MM.DD.' etc.)
+            # keeps the strptime behavior (and its failures)
+            if len(token) == 10 and token[4] == "." and token[7] == "." and \
+                    token[:4].isdigit() and token[5:7].isdigit() and token[8:].isdigit():
+                return date(int(token[:4]), int(token[5:7]), int(token[8:]))
+            return datetime.strptime(token, "%Y.%m.%d").date()
 
         # 2. Relative Date
+        for suffix, unit in RELATIVE_UNITS:
+            if suffix in date_str:
+                break
+        else:
+            return None
+
         collected_date = datetime.fromisoformat(collected_at).date() if collected_at else datetime.now().date()
-        
-        if "분 전" in date_str:
+        if unit is None:
             return collected_date # Treat as today
-        elif "시간 전" in date_str:
-            hours_match = re.search(r"(\d+)", date_str)
-            if hours_match:
-                hours = int(hours_match.group(1))
-                collected_dt = datetime.fromisoformat(collected_at)
-                article_dt = collected_dt - timedelta(hours=hours)
-                return article_dt.date()
-            return collected_date
-        elif "일 전" in date_str:
-            days_match = re.search(r"(\d+)", date_str)
-            if days_match:
-                days = int(days_match.group(1))
-                return collected_date - timedelta(days=days)
+
+        num_match = NUM_RE.search(date_str)
+        if not num_match:
             return collected_date
-        elif "주 전" in date_str:
-              weeks_match = re.search(r"(\d+)", date_str)
-              if weeks_match:
-                  weeks = int(weeks_match.group(1))
-                  return collected_date - timedelta(weeks=weeks)
-              return collected_date
-        else:
-            return None
+        amount = int(num_match.group(1))
+
+        if unit == "hours":
+            # Hours can cross midnight, so subtract from the full timestamp
+            collected_dt = datetime.fromisoformat(collected_at)
+            return (collected_dt - timedelta(hours=amount)).date()
+        return collected_date - timedelta(**{unit: amount})
             
     except Exception as e:
         # print(f"Error parsing date '{date_str}': {e}")
         return None
 
+def count_file_dates(path):
+    """Per-day article counts for one batch file. Runs in a worker process."""
+    c = Counter()
+    try:
+        for line in iter_lines(path):
+            if not line.strip(): continue
+            try:
+                item = orjson.loads(line)
+                pub = item.get("published_at")
+                collected = item.get("collected_at_kst")
+                
+                date_obj = parse_relative_date(pub, collected)
+                if date_obj:
+                    c[date_obj] += 1
+            except orjson.JSONDecodeError:
+                continue
+    except Exception as e:
+        return c, str(e)
+    return c, None
+
 def check_range():
     # Use relative path from current working directory
     base_dir = os.path.join("GPR_2025_HQ", "run_20260101_182515")
@@ -64,41 +96,29 @@ def check_range():
     
     print(f"Scanning {len(files)} files...")
     
-    dates = []
+    # Only per-day counts are kept; min/max/total come from the (few) unique days
+    c = Counter()
     
-    for f in files:
-        try:
-            with open(f, "r", encoding="utf-8") as f_in:
-                for line in f_in:
-                    if not line.strip(): continue
-                    try:
-                        item = json.loads(line)
-                        pub = item.get("published_at")
-                        collected = item.get("collected_at_kst")
-                        
-                        date_obj = parse_relative_date(pub, collected)
-                        if date_obj:
-                            dates.append(date_obj)
-                    except json.JSONDecodeError:
-                        continue
-        except Exception as e:
-            print(f"Error reading file {f}: {e}")
+    # Files are independent, so parse them in parallel and merge the partial counts
+    with ProcessPoolExecutor() as executor:
+        for f, (partial, error) in zip(files, executor.map(count_file_dates, files)):
+            c.update(partial)
+            if error:
+                print(f"Error reading file {f}: {error}")
     
-    if not dates:
+    if not c:
         print("No valid dates found.")
         return
 
-    min_date = min(dates)
-    max_date = max(dates)
+    sorted_dates = sorted(c.keys())
+    min_date = sorted_dates[0]
+    max_date = sorted_dates[-1]
     
-    print(f"Total Valid Dates: {len(dates)}")
+    print(f"Total Valid Dates: {sum(c.values())}")
     print(f"Date Range: {min_date} ~ {max_date}")
     
     # Optional: Distribution
-    from collections import Counter
-    c = Counter(dates)
     print("\nDate Distribution:")
-    sorted_dates = sorted(c.keys())
     
     # Print first 5 and last 5 if too many
     if len(sorted_dates) > 10:
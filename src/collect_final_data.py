@@ -1,6 +1,6 @@
 import asyncio
 import argparse
-import json
+import orjson
 import os
 import sys
 import logging
@@ -15,6 +15,7 @@ import aiohttp
 
 # Import project parsers
 from src.parsers import parse_demographics, fetch_comments_api, extract_oid_aid, parse_article_details
+from src.selectors import DemographicSelectors
 # We need to mock or use config
 from src.config import config
 
@@ -35,11 +36,18 @@ ARTICLES_FILE = os.path.join(OUTPUT_DIR, f"final_articles_{datetime.now().strfti
 COMMENTS_FILE = os.path.join(OUTPUT_DIR, f"final_comments_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl")
 
 CONCURRENCY = 4
+CHART_WAIT_MS = 3000
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font"}
+
+# Output handles, opened once in main(). Writes happen between awaits on the
+# single event-loop thread, so lines from concurrent workers never interleave.
+_articles_f = None
+_comments_f = None
 
 async def process_url(sem, context, http_session, line: str):
     async with sem:
         try:
-            meta = json.loads(line)
+            meta = orjson.loads(line)
             url = meta["url"]
             oid, aid = extract_oid_aid(url)
             
@@ -61,16 +69,15 @@ async def process_url(sem, context, http_session, line: str):
             # 1. Playwright: Visit page for Demographics & Title
             page = await context.new_page()
             try:
-                # Block heavy assets
-                await page.route("**/*", lambda route: route.abort() 
-                         if route.request.resource_type in ["image", "media", "font"] 
-                         else route.continue_())
-
-                await page.goto(url, wait_until="domcontentloaded", timeout=20000)
+                await page.goto(url, wait_until="domcontentloaded")
                 
-                # Scroll to ensure chart load
+                # Scroll to ensure chart load, then wait for the chart itself
+                # (inputs are pre-filtered to have stats, so this usually returns early)
                 await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                await asyncio.sleep(1.0) # Wait for animation
+                try:
+                    await page.wait_for_selector(DemographicSelectors.CHART_AREA, state="attached", timeout=CHART_WAIT_MS)
+                except Exception:
+                    logger.debug(f"Chart not attached within {CHART_WAIT_MS}ms: {url}")
                 
                 # Parse Stats
                 demog = await parse_demographics(page)
@@ -116,15 +123,27 @@ async def process_url(sem, context, http_session, line: str):
         except Exception as e:
             logger.error(f"Critical Worker Error: {e}")
 
+async def block_heavy(route):
+    """
+    Context-wide route handler. Article pages are only read for their DOM (title, comment
+    count, demographics chart; comments come from the API), so images, media and fonts
+    are dropped. Stylesheets stay: the visibility checks depend on layout.
+    """
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
 def save_article(data):
-    with open(ARTICLES_FILE, "a", encoding="utf-8") as f:
-        f.write(json.dumps(data, ensure_ascii=False) + "\n")
+    _articles_f.write(orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS) + b"\n")
+    # One flush per URL keeps the append incremental (comments are saved first)
+    _comments_f.flush()
+    _articles_f.flush()
 
 def save_comments(comments, url):
-    with open(COMMENTS_FILE, "a", encoding="utf-8") as f:
-        for c in comments:
-            c["article_url"] = url
-            f.write(json.dumps(c, ensure_ascii=False) + "\n")
+    for c in comments:
+        c["article_url"] = url
+        _comments_f.write(orjson.dumps(c, option=orjson.OPT_NON_STR_KEYS) + b"\n")
 
 async def main():
     os.makedirs(OUTPUT_DIR, exist_ok=True)
@@ -144,19 +163,24 @@ async def main():
     
     sem = asyncio.Semaphore(CONCURRENCY)
     
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        context = await browser.new_context(user_agent="Mozilla/5.0 ...") # User agent from config ideally
-        
-        async with aiohttp.ClientSession() as http_session:
-            tasks = []
-            for line in urls:
-                tasks.append(asyncio.create_task(process_url(sem, context, http_session, line)))
-                
-            # Progress monitoring could be added here
-            await asyncio.gather(*tasks)
+    global _articles_f, _comments_f
+    with open(ARTICLES_FILE, "ab") as _articles_f, open(COMMENTS_FILE, "ab") as _comments_f:
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=True)
+            context = await browser.new_context(user_agent="Mozilla/5.0 ...") # User agent from config ideally
+            # Registered once here so every page inherits it (no per-URL page.route)
+            await context.route("**/*", block_heavy)
+            context.set_default_navigation_timeout(20000)
             
-        await browser.close()
+            async with aiohttp.ClientSession() as http_session:
+                tasks = []
+                for line in urls:
+                    tasks.append(asyncio.create_task(process_url(sem, context, http_session, line)))
+                    
+                # Progress monitoring could be added here
+                await asyncio.gather(*tasks)
+                
+            await browser.close()
 
 if __name__ == "__main__":
     asyncio.run(main())
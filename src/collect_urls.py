@@ -1,13 +1,18 @@
 import argparse
-import requests
-from bs4 import BeautifulSoup
-import time
+import asyncio
+import aiohttp
+from selectolax.parser import HTMLParser
 import json
 import os
+import sys
 from datetime import datetime, timedelta
 from urllib.parse import urlparse, parse_qs
 import logging
-from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.url_index import SeenUrlIndex
 
 # Logging setup
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -18,8 +23,11 @@ HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/115.0.0.0 Safari/537.36"
 }
 OUTPUT_FILE = "GPR_URLS/all_article_urls.jsonl"
+SEEN_DB = "GPR_URLS/all_article_urls.seen.sqlite"
+MAX_CONCURRENCY = 20  # Hard cap on concurrent dates (politeness)
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=5)
 
-def get_news_urls(keyword, date_str, page=1):
+async def get_news_urls(session: aiohttp.ClientSession, keyword, date_str, page=1):
     """
     Fetches news URLs for a given keyword and date from Naver News Search.
     date_str format: YYYY.MM.DD
@@ -29,15 +37,16 @@ def get_news_urls(keyword, date_str, page=1):
     url = f"https://search.naver.com/search.naver?where=news&query={keyword}&sm=tab_opt&sort=0&photo=0&field=0&pd=3&ds={date_str}&de={date_str}&docid=&related=0&mynews=0&office_type=0&office_section_code=0&news_office_checked=&nso=so%3Ar%2Cp%3Afrom{date_str.replace('.','')}to{date_str.replace('.','')}&is_sug_officeid=0&start={start_idx}"
     
     try:
-        response = requests.get(url, headers=HEADERS, timeout=5)
-        if response.status_code != 200:
-            logger.warning(f"Status {response.status_code} for {date_str} p{page}")
-            return [], False
+        async with session.get(url, timeout=REQUEST_TIMEOUT) as response:
+            if response.status != 200:
+                logger.warning(f"Status {response.status} for {date_str} p{page}")
+                return [], False
+            html = await response.read()  # parser takes bytes; skip the str decode
 
-        soup = BeautifulSoup(response.text, "html.parser")
+        tree = HTMLParser(html)
         
         # Check for "No results"
-        no_result = soup.select_one(".not_found02")
+        no_result = tree.css_first(".not_found02")
         if no_result:
             return [], False
 
@@ -49,11 +58,12 @@ def get_news_urls(keyword, date_str, page=1):
         
         # Selector for "Naver News" link: a.info (press_edit etc don't match exactly)
         # Better: Look for class="info" and text="네이버뉴스"
-        info_links = soup.select("a.info")
+        info_links = tree.css("a.info")
         for link in info_links:
-            if "네이버뉴스" in link.text and "news.naver.com" in link.get("href"):
+            href = link.attributes.get("href") or ""
+            if "네이버뉴스" in link.text() and "news.naver.com" in href:
                 articles.append({
-                    "url": link.get("href"),
+                    "url": href,
                     "date": date_str,
                     "keyword": keyword
                 })
@@ -63,41 +73,62 @@ def get_news_urls(keyword, date_str, page=1):
         logger.error(f"Error fetching {date_str} p{page}: {e}")
         return [], False
 
-def scan_date(date, keyword):
-    """Scans all pages for a single date."""
+async def scan_date(session: aiohttp.ClientSession, sem: asyncio.Semaphore, date, keyword):
+    """
+    Scans all pages for a single date.
+    Finds the last populated page with exponential probing (1, 2, 4, 8, ...)
+    plus binary search, then fills in the remaining pages for coverage.
+    Every page is fetched at most once; dates run concurrently under `sem`.
+    """
     date_str = date.strftime("%Y.%m.%d")
-    collected = []
     
     # Naver limits to 400 pages (4000 items) usually.
-    # We stop if empty.
     max_pages = 400 
     
-    # Heuristic: Check page 1. If empty, stop.
-    # Check page 10, 20... exponential to find end? No, just linear is safer for coverage.
-    # Or parallelize pages? No, Naver blocks aggressive parallel on same query.
-    # Better: Linear scan for pages, but parallelize DATES.
-    
-    for page in range(1, max_pages + 1):
-        urls, has_more = get_news_urls(keyword, date_str, page)
-        if not urls and not has_more:
-            break
-            
-        collected.extend(urls)
-        
-        # If less than 10 items found, it's likely the last page
-        if len(urls) < 10:
-            break
-            
-        time.sleep(0.1) # Polite delay
+    # page -> urls, or None when the page had no results / failed
+    fetched = {}
+
+    async def has_results(page):
+        if page not in fetched:
+            urls, has_more = await get_news_urls(session, keyword, date_str, page)
+            fetched[page] = urls if has_more else None
+        return fetched[page] is not None
+
+    async with sem:
+        if not await has_results(1):
+            return []
+
+        # Exponential probe: lo is populated, hi is empty (or past the limit)
+        lo, hi = 1, 2
+        while hi <= max_pages and await has_results(hi):
+            lo, hi = hi, hi * 2
+        hi = min(hi, max_pages + 1)
+
+        # Binary search for the last populated page
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            if await has_results(mid):
+                lo = mid
+            else:
+                hi = mid
+
+        # Coverage: fetch the pages the probe skipped.
+        # A page with fewer than 10 Naver-hosted links is not necessarily the last one.
+        collected = []
+        for page in range(1, lo + 1):
+            if page not in fetched:
+                await asyncio.sleep(0.1) # Polite delay
+                await has_results(page)
+            collected.extend(fetched[page] or [])
         
     return collected
 
-def main():
+async def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--keyword", type=str, default="국민연금")
     parser.add_argument("--start", type=str, default="2024.12.20")
     parser.add_argument("--end", type=str, default="2025.06.20")
-    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=4, help=f"Concurrency factor (x8 dates in flight, capped at {MAX_CONCURRENCY})")
     args = parser.parse_args()
     
     # Create Output Dir
@@ -111,43 +142,50 @@ def main():
     
     logger.info(f"Target: {args.keyword}")
     logger.info(f"Range: {args.start} ~ {args.end} ({len(dates)} days)")
-    logger.info(f"Workers: {args.workers}")
+    concurrency = min(args.workers * 8, MAX_CONCURRENCY)
+    logger.info(f"Concurrent dates: {concurrency}")
     
     total_count = 0
     
-    # Load seen URLs
-    seen = set()
-    if os.path.exists(OUTPUT_FILE):
-        with open(OUTPUT_FILE, "r", encoding="utf-8") as f:
-            for line in f:
-                try:
-                    seen.add(json.loads(line)["url"])
-                except:
-                    pass
+    # Seen URLs live in sqlite; only lines appended since the last run are parsed
+    seen = SeenUrlIndex(SEEN_DB, OUTPUT_FILE)
     logger.info(f"Loaded {len(seen)} existing URLs.")
 
-    with ThreadPoolExecutor(max_workers=args.workers) as executor:
-        future_to_date = {executor.submit(scan_date, date, args.keyword): date for date in dates}
+    sem = asyncio.Semaphore(concurrency)
+
+    async def scan(date):
+        try:
+            return date, await scan_date(session, sem, date, args.keyword), None
+        except Exception as e:
+            return date, [], e
+
+    async with aiohttp.ClientSession(headers=HEADERS) as session:
+        tasks = [asyncio.create_task(scan(date)) for date in dates]
         
+        # Results are written from this coroutine only, so there is a single writer
         with open(OUTPUT_FILE, "a", encoding="utf-8") as f:
-            for future in as_completed(future_to_date):
-                date = future_to_date[future]
+            for next_done in asyncio.as_completed(tasks):
+                date, results, error = await next_done
+                if error:
+                    logger.error(f"Date {date} failed: {error}")
+                    continue
                 try:
-                    results = future.result()
                     new_items = 0
                     for item in results:
-                        if item["url"] not in seen:
-                            seen.add(item["url"])
+                        if seen.add(item["url"]):
                             f.write(json.dumps(item, ensure_ascii=False) + "\n")
                             new_items += 1
                             total_count += 1
                     
                     logger.info(f"Done {date.strftime('%Y-%m-%d')}: Found {len(results)} (New: {new_items})")
                     f.flush() # Secure write
+                    seen.commit(os.path.getsize(OUTPUT_FILE))
                 except Exception as e:
                     logger.error(f"Date {date} failed: {e}")
     
+    seen.close()
+
     logger.info(f"Completed. Total collected: {total_count}")
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
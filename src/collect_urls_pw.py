@@ -1,124 +1,272 @@
 import asyncio
 import argparse
-import json
+import orjson
 import os
+import sys
 import logging
 from datetime import datetime, timedelta
-from typing import List, Set
-from playwright.async_api import async_playwright, Page, BrowserContext
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+import aiohttp
+from selectolax.parser import HTMLParser
+from playwright.async_api import async_playwright, BrowserContext, Page, Route
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config import config
+from src.url_index import SeenUrlIndex
+from src.jsonl import JsonlWriter
+from src.rate_limit import TokenBucket
 
 # Logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
 OUTPUT_FILE = "GPR_URLS/all_article_urls.jsonl"
-SEMAPHORE_LIMIT = 3  # Reduced from 5 for stability
+SEEN_DB = "GPR_URLS/all_article_urls.seen.sqlite"
+NUM_WORKERS = 3  # Reduced from 5 for stability
+REQUESTS_PER_SECOND = 2.0  # Shared across workers (HTTP + browser)
+SPECULATIVE_PAGES = 4  # Max result pages of one date fetched concurrently
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/115.0.0.0 Safari/537.36"
+BLOCKED_MARKER = "서비스를 이용할 수 없습니다"
+BLOCKED_MARKER_BYTES = BLOCKED_MARKER.encode("utf-8")  # HTTP path checks raw bytes
+# Naver-hosted article links (the '네이버뉴스' buttons), matched by href prefix in one selector pass
+NEWS_LINK_SELECTOR = ", ".join(
+    f"a[href^='https://{host}/']" for host in ("n.news.naver.com", "sports.news.naver.com", "entertain.naver.com")
+)
+# Browser fallback: no-results flag + matching hrefs in a single evaluate round trip.
+# hrefs come back as one newline-joined string rather than an array of strings.
+SCAN_PAGE_JS = """sel => ({
+    noResults: !!document.querySelector('.not_found02'),
+    hrefs: Array.from(document.querySelectorAll(sel), a => a.href).join('\\n')
+})"""
+# The fallback only reads anchors, so nothing visual needs to load
+BLOCKED_RESOURCE_TYPES = {"image", "stylesheet", "font", "media"}
 
-async def fetch_urls_for_date(context: BrowserContext, keyword: str, date_str: str, seen_urls: Set[str]):
-    page = await context.new_page()
-    collected_count = 0
+# (no_results, urls) for one search page; None when the page could not be fetched
+PageResult = Optional[Tuple[bool, List[str]]]
+
+async def block_heavy(route: Route):
+    """Context-wide route handler: drop assets the anchor scrape doesn't need."""
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+def on_blocked(limiter: TokenBucket):
+    """
+    Block page / 403: pause every worker via the shared bucket. Raises PermissionError
+    (stops the run) once blocks persist past max_retry_429 backoffs and stop_on_403_run is set.
+    """
+    limiter.backoff()
+    if config.crawler.stop_on_403_run and limiter.strikes > config.crawler.max_retry_429:
+        raise PermissionError(f"Blocked by Naver after {limiter.strikes} consecutive backoffs")
+
+async def fetch_page_http(session: aiohttp.ClientSession, limiter: TokenBucket, url: str, date_str: str, page_no: int) -> PageResult:
+    """Fetch + parse one search page over plain HTTP (no browser). Retries 429/5xx with shared backoff."""
+    timeout = aiohttp.ClientTimeout(total=config.search.request_timeout)
+    retries_429, retries_5xx = 0, 0
+    while True:
+        try:
+            await limiter.acquire()
+            async with session.get(url, timeout=timeout) as resp:
+                status = resp.status
+                html = await resp.read() if status == 200 else b""
+        except Exception as e:
+            logger.warning(f"HTTP error on {date_str} p{page_no}: {e}")
+            return None
+        if status == 429 and retries_429 < config.crawler.max_retry_429:
+            retries_429 += 1
+        elif status >= 500 and retries_5xx < config.crawler.max_retry_5xx:
+            retries_5xx += 1
+        else:
+            break
+        logger.warning(f"HTTP {status} on {date_str} p{page_no}; backing off")
+        limiter.backoff()
+
+    if status == 403:
+        logger.error(f"HTTP 403 on {date_str} p{page_no}.")
+        on_blocked(limiter)
+        return None
+    if status != 200:
+        logger.warning(f"HTTP {status} on {date_str} p{page_no}")
+        return None
+
+    if BLOCKED_MARKER_BYTES in html:
+        logger.error("Naver Blocked (CAPTCHA/Limit) on HTTP path.")
+        on_blocked(limiter)
+        return None
+    limiter.success()
+
+    tree = HTMLParser(html)
+    if tree.css_first(".not_found02"):
+        return True, []
+
+    # Same selector as the browser path; dict.fromkeys drops repeats (title + button) in page order
+    urls = list(dict.fromkeys(a.attributes.get("href") for a in tree.css(NEWS_LINK_SELECTOR)))
+    return False, urls
+
+async def fetch_page_browser(page: Page, limiter: TokenBucket, url: str, date_str: str, page_no: int) -> PageResult:
+    """Playwright fallback for pages whose results are rendered client-side."""
     try:
-        # Naver Advanced Search URL (Daily)
-        # pd=3 (custom period), ds=date, de=date
-        # sort=0 (relevance) or 1? Let's use Relevance (0) since we are bounded by date anyway.
-        # Actually, using 'Latest' (1) is safer for pagination consistency?
-        # Let's stick to sort=0 (Relevance) inside a single day, or 1 (Latest).
+        async with limiter:
+            await page.goto(url, wait_until="domcontentloaded", timeout=15000)
+    except Exception as e:
+        logger.warning(f"Timeout/Error on {date_str} p{page_no}: {e}")
+        # Retry once (paced by the limiter)
+        try:
+            async with limiter:
+                await page.goto(url, wait_until="domcontentloaded", timeout=15000)
+        except Exception as e:
+            logger.warning(f"Retry failed on {date_str} p{page_no}: {e}")
+            return None
+
+    # "No results" check + URL extraction in one JS call; the selector already restricts to Naver-hosted news
+    scan = await page.evaluate(SCAN_PAGE_JS, NEWS_LINK_SELECTOR)
+    if scan["noResults"]:
+        return True, []
+    hrefs = scan["hrefs"]
+    new_urls = list(dict.fromkeys(hrefs.split("\n"))) if hrefs else []
+
+    if not new_urls:
+        # Debug HTML
+        content = await page.content()
+        if BLOCKED_MARKER in content:
+             logger.error("Naver Blocked (CAPTCHA/Limit).")
+             on_blocked(limiter)
+             return False, []
+    limiter.success()
+    return False, new_urls
+
+async def fetch_urls_for_date(get_page: Callable[[], Awaitable[Page]], session: aiohttp.ClientSession, limiter: TokenBucket, keyword: str, date_str: str, base_url: str, seen: SeenUrlIndex, writer: JsonlWriter):
+    """
+    Collects all result pages for one date; `base_url` is its search URL without `start`.
+    HTTP first, fetching a window of upcoming pages concurrently (1, 2, then up to
+    SPECULATIVE_PAGES); falls back to the worker's Playwright page (`get_page`) when
+    HTTP fails, returns no links, or drops sharply for `low_streak_trigger` pages in a row.
+    """
+    collected_count = 0
+    prev_count: Optional[int] = None
+    low_streak = 0
+
+    def page_url(page_no: int) -> str:
+        start_index = (page_no - 1) * 10 + 1
+        return f"{base_url}&start={start_index}"
+
+    async def process_page(page_no: int, result: PageResult) -> bool:
+        """Handles one page in page order. Returns False when the date is finished."""
+        nonlocal collected_count, prev_count, low_streak
+        fallback_needed = result is None
+        if result is not None:
+            no_results, new_urls = result
+            if no_results:
+                return False
+            if not new_urls:
+                fallback_needed = True  # Likely JS-rendered results
+            elif prev_count and len(new_urls) < prev_count * config.search.low_drop_ratio:
+                low_streak += 1
+                if low_streak >= config.search.low_streak_trigger:
+                    fallback_needed = True
+            else:
+                low_streak = 0
+
+        if fallback_needed:
+            low_streak = 0
+            result = await fetch_page_browser(await get_page(), limiter, page_url(page_no), date_str, page_no)
+            if result is None:
+                return False
+            no_results, new_urls = result
+            if no_results:
+                # logger.info(f"[{date_str}] 'No results' element found.")
+                return False
+
+        # logger.info(f"[{date_str}] Page {page_no}: Found {len(new_urls)} URLs keys")
         
-        base_url = f"https://search.naver.com/search.naver?where=news&query={keyword}&sm=tab_opt&sort=1&photo=0&field=0&pd=3&ds={date_str}&de={date_str}"
+        if not new_urls:
+            return False
+        prev_count = len(new_urls)
+            
+        batch_new = 0
+        # Everything but the url is fixed for the page: encode it once, splice the url in per line
+        tail = b"," + orjson.dumps({
+            "date": date_str,
+            "keyword": keyword,
+            "collected_at": datetime.now().isoformat()
+        })[1:]
+        for u in new_urls:
+            if seen.add(u):
+                await writer.put(b'{"url":' + orjson.dumps(u) + tail)
+                batch_new += 1
         
-        current_page = 1
+        collected_count += batch_new
+        
+        # Next page check
+        # If we found less than 10 links, it's the last page
+        return len(new_urls) >= 10
+
+    try:
         max_pages_per_day = 400 # Theoretical max
+        current_page = 1
+        window = 1
         
         while current_page <= max_pages_per_day:
-            start_index = (current_page - 1) * 10 + 1
-            url = f"{base_url}&start={start_index}"
-            
-            try:
-                await page.goto(url, wait_until="domcontentloaded", timeout=15000)
-            except Exception as e:
-                logger.warning(f"Timeout/Error on {date_str} p{current_page}: {e}")
-                # Retry once?
-                await asyncio.sleep(2)
-                try:
-                    await page.goto(url, wait_until="domcontentloaded", timeout=15000)
-                except:
-                    break
+            pages = range(current_page, min(current_page + window, max_pages_per_day + 1))
+            if config.search.force_http:
+                # Speculative: pages past the last one come back empty and are simply ignored
+                results = await asyncio.gather(*(
+                    fetch_page_http(session, limiter, page_url(p), date_str, p) for p in pages
+                ))
+            else:
+                results = [None] * len(pages)
 
-            # Check for "No results"
-            no_result = await page.query_selector(".not_found02")
-            if no_result:
-                # logger.info(f"[{date_str}] 'No results' element found.")
-                break
-                
-            # Extract URLs - Robust Method
-            # Use Playwright's locator to find 'a' tags containing '네이버뉴스' text
-            new_urls = await page.locator("a", has_text="네이버뉴스").evaluate_all("els => els.map(e => e.href)")
-            
-            # Filter to ensure they look like news links (optional, but safer)
-            new_urls = [u for u in new_urls if "news.naver.com" in u or "entertain.naver.com" in u or "sports.news.naver.com" in u]
-            
-            # logger.info(f"[{date_str}] Page {current_page}: Found {len(new_urls)} URLs keys")
-            
-            if not new_urls:
-                # Debug HTML
-                content = await page.content()
-                if "서비스를 이용할 수 없습니다" in content:
-                     logger.error("Naver Blocked (CAPTCHA/Limit).")
-                     await asyncio.sleep(10)
-                break
-                
-            # Write immediately to file (locking needed? standard open 'a' is atomic enough for lines usually, but async...)
-            # We'll just append to a list and return, or write to a shared queue?
-            # Creating a critical section for file write might be safer, or just use one file handle in main.
-            # For simplicity, let's return list chunk.
-            
-            batch_new = 0
-            lines_to_write = []
-            for u in new_urls:
-                if u not in seen_urls:
-                    seen_urls.add(u)
-                    meta = {
-                        "url": u,
-                        "date": date_str,
-                        "keyword": keyword,
-                        "collected_at": datetime.now().isoformat()
-                    }
-                    lines_to_write.append(json.dumps(meta, ensure_ascii=False))
-                    batch_new += 1
-            
-            if lines_to_write:
-                # Append to file
-                with open(OUTPUT_FILE, "a", encoding="utf-8") as f:
-                    f.write("\n".join(lines_to_write) + "\n")
-            
-            collected_count += batch_new
-            
-            # Next page check
-            # If we found less than 10 links, it's the last page
-            if len(new_urls) < 10:
-                break
-                
-            current_page += 1
-            # Random sleep to be nice
-            await asyncio.sleep(1.5)
+            for page_no, result in zip(pages, results):
+                if not await process_page(page_no, result):
+                    break
+            else:
+                current_page = pages[-1] + 1
+                window = min(window * 2, SPECULATIVE_PAGES)
+                continue
+            break
             
+    except PermissionError:
+        raise  # Run-level block; handled in main
     except Exception as e:
         logger.error(f"Error processing {date_str}: {e}")
-    finally:
-        await page.close()
         
     if collected_count > 0:
         logger.info(f"[{date_str}] Collected {collected_count} URLs")
     return collected_count
 
-async def worker(sem, context, keyword, date_queue, seen_urls):
+async def worker(browser, session, limiter, keyword, date_queue, seen, writer):
+    """Consumes (date_str, base_url) items until it receives the None sentinel."""
     total_collected = 0
-    while not date_queue.empty():
-        date_str = await date_queue.get()
-        async with sem:
-            count = await fetch_urls_for_date(context, keyword, date_str, seen_urls)
-            total_collected += count
-        date_queue.task_done()
+    # Own browser context + page per worker, reused across dates; opened on the first fallback only
+    context: Optional[BrowserContext] = None
+    page: Optional[Page] = None
+
+    async def get_page() -> Page:
+        nonlocal context, page
+        if page is None:
+            context = await browser.new_context(user_agent=USER_AGENT)
+            await context.route("**/*", block_heavy)
+            page = await context.new_page()
+        return page
+
+    try:
+        while True:
+            item = await date_queue.get()
+            if item is None:
+                date_queue.task_done()
+                break
+            date_str, base_url = item
+            try:
+                total_collected += await fetch_urls_for_date(get_page, session, limiter, keyword, date_str, base_url, seen, writer)
+            finally:
+                date_queue.task_done()
+    finally:
+        if context is not None:
+            await context.close()
     return total_collected
 
 async def main():
@@ -127,6 +275,8 @@ async def main():
     parser.add_argument("--start", type=str, default="2024.12.20")
     parser.add_argument("--end", type=str, default="2025.06.20")
     parser.add_argument("--headless", action="store_true", default=True) # Default headless
+    parser.add_argument("--workers", type=int, default=NUM_WORKERS, help="Dates processed concurrently")
+    parser.add_argument("--rate", type=float, default=REQUESTS_PER_SECOND, help="Max search requests per second (all workers)")
     args = parser.parse_args()
 
     # Ensure output dir
@@ -135,52 +285,81 @@ async def main():
     # Generate dates
     start_date = datetime.strptime(args.start, "%Y.%m.%d")
     end_date = datetime.strptime(args.end, "%Y.%m.%d")
-    date_list = []
-    curr = start_date
-    while curr <= end_date:
-        date_list.append(curr.strftime("%Y.%m.%d"))
-        curr += timedelta(days=1)
+    date_list = [(start_date + timedelta(days=i)).strftime("%Y.%m.%d") for i in range((end_date - start_date).days + 1)]
+    
+    # Naver Advanced Search URL (Daily), built once per date
+    # pd=3 (custom period), ds=date, de=date
+    # sort=1 (Latest) keeps pagination consistent within a single day.
+    base_urls = {
+        d: f"https://search.naver.com/search.naver?where=news&query={args.keyword}&sm=tab_opt&sort=1&photo=0&field=0&pd=3&ds={d}&de={d}"
+        for d in date_list
+    }
         
     logger.info(f"Target: {args.keyword}")
     logger.info(f"Range: {args.start} ~ {args.end} ({len(date_list)} days)")
     
-    # Load seen
-    seen_urls = set()
-    if os.path.exists(OUTPUT_FILE):
-        try:
-            with open(OUTPUT_FILE, "r", encoding="utf-8") as f:
-                for line in f:
-                    if line.strip():
-                        try:
-                            seen_urls.add(json.loads(line)["url"])
-                        except: pass
-        except: pass
-    logger.info(f"Loaded {len(seen_urls)} existing URLs.")
+    # Seen URLs live in sqlite (exact, on disk); only lines appended since the last run are parsed.
+    # Indexing runs on a thread while the browser starts.
+    seen_task = asyncio.create_task(asyncio.to_thread(SeenUrlIndex, SEEN_DB, OUTPUT_FILE))
 
     # Playwright Setup
     async with async_playwright() as p:
         browser = await p.chromium.launch(headless=args.headless)
-        context = await browser.new_context(
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/115.0.0.0 Safari/537.36"
-        )
         
-        queue = asyncio.Queue()
-        for d in date_list:
-            queue.put_nowait(d)
-            
-        sem = asyncio.Semaphore(SEMAPHORE_LIMIT)
+        seen = await seen_task
+        logger.info(f"Loaded {len(seen)} existing URLs.")
         
-        # Create workers (e.g. 5 concurrent workers consuming the queue)
-        # Actually let's create 5 distinct tasks that loop until queue empty
-        tasks = []
-        for _ in range(SEMAPHORE_LIMIT):
-            tasks.append(asyncio.create_task(worker(sem, context, args.keyword, queue, seen_urls)))
-            
-        await asyncio.gather(*tasks)
+        # Bounded queue: dates are fed as workers free up; one None sentinel per worker ends the run
+        queue = asyncio.Queue(maxsize=2 * args.workers)
         
-        await browser.close()
+        # Single writer task; the seen index is committed only once its lines are on disk.
+        # Workers never touch the file themselves, so there is no per-worker write contention
+        # to shard away, and one output keeps the seen-index offset meaningful after a crash.
+        writer = JsonlWriter(OUTPUT_FILE, on_flush=seen.commit)
+        writer.start()
         
+        # Politeness is a shared request rate, not per-worker sleeps
+        limiter = TokenBucket(args.rate, backoff_base=config.crawler.backoff_base)
+        
+        # One pooled HTTP session for the primary (non-browser) search path
+        connector = aiohttp.TCPConnector(limit=64, limit_per_host=16)
+        async with aiohttp.ClientSession(connector=connector, headers={"User-Agent": USER_AGENT}) as session:
+            # The worker count is the concurrency limit
+            tasks = [
+                asyncio.create_task(worker(browser, session, limiter, args.keyword, queue, seen, writer))
+                for _ in range(args.workers)
+            ]
+
+            async def feed():
+                for d in date_list:
+                    await queue.put((d, base_urls[d]))
+                for _ in tasks:
+                    await queue.put(None)
+            feeder = asyncio.create_task(feed())
+                
+            try:
+                await asyncio.gather(*tasks)
+            except PermissionError as e:
+                # One worker hit a persistent block: stop everyone, keep what was collected
+                logger.error(f"Stopping run: {e}")
+                for t in tasks:
+                    t.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+            finally:
+                feeder.cancel()
+        
+        await writer.close()
+        
+        await browser.close()
+    
+    seen.close()
     logger.info("Collection Complete.")
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    # uvloop is optional (not available on Windows); the default loop works the same, only slower
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
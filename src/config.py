@@ -1,10 +1,19 @@
 import yaml
 import os
+import functools
 from dataclasses import dataclass, field
 from typing import List, Optional
 
+# libyaml-backed loader when PyYAML was built with it; pure-Python otherwise
+try:
+    from yaml import CSafeLoader as _Loader
+except ImportError:
+    from yaml import SafeLoader as _Loader
 
-@dataclass
+
+# Config sections are immutable once loaded (slots: fixed attribute layout, no per-instance dict).
+# Derive variants with dataclasses.replace(...).
+@dataclass(slots=True, frozen=True)
 class SearchConfig:
     keywords: List[str] = field(default_factory=lambda: ["국민연금"])
     max_pages: int = 2  # Number of search result pages to scan per keyword
@@ -19,7 +28,7 @@ class SearchConfig:
     request_timeout: float = 8.0         # seconds for search HTTP
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class CrawlerConfig:
     headless: bool = True
     request_delay_min: float = 0.5
@@ -35,10 +44,17 @@ class CrawlerConfig:
     max_retry_5xx: int = 3
     stop_on_403_run: bool = True   # run-level stop when repeated 403
     http_total_timeout: float = 30.0  # seconds per HTTP request
+    connector_limit: int = 64          # pooled HTTP connections overall (aiohttp default is 100)
+    connector_limit_per_host: int = 16 # pooled connections per host; raise with article_sem/page_sem
+    dns_cache_ttl: int = 300           # seconds a resolved host is reused
+    # Comment API client: "requests" (pooled Session on a worker thread; its TLS fingerprint is
+    # accepted by apis.naver.com), "aiohttp" (the crawler's shared session, no thread hop) or
+    # "httpx" (HTTP/2, page requests multiplexed on one connection; needs httpx[http2])
+    comment_api_transport: str = "requests"
     only_urls: bool = False  # If true, skips comment body collection
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class FilterConfig:
     # Default keywords target 국민연금 related news; empty list => match all
     keywords: List[str] = field(default_factory=lambda: ["국민연금", "연금", "연금 개혁", "연금개혁", "기초연금", "퇴직연금", "공적연금"])
@@ -49,7 +65,7 @@ class FilterConfig:
     demographics_ui_fallback: bool = True  # when socialInfo missing
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class StorageConfig:
     # Default to a "GPR" folder in the user's home directory (e.g., C:/Users/Name/Documents/GPR or similar)
     # Or simply "./GPR" relative to execution. Let's use relative for portability unless absolute is needed.
@@ -64,7 +80,7 @@ class StorageConfig:
     unique_batch_files: bool = True  # avoid collision on rerun
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Config:
     search: SearchConfig = field(default_factory=SearchConfig)
     crawler: CrawlerConfig = field(default_factory=CrawlerConfig)
@@ -78,7 +94,7 @@ class Config:
             return cls()
 
         with open(config_path, 'r', encoding='utf-8') as f:
-            data = yaml.safe_load(f) or {}
+            data = yaml.load(f, Loader=_Loader) or {}
 
         return cls(
             search=SearchConfig(**data.get('search', {})),
@@ -88,5 +104,15 @@ class Config:
         )
 
 
-# Global instance for easy access if needed
-config = Config.load()
+@functools.lru_cache(maxsize=None)
+def get_config() -> Config:
+    """Default config (config/config.yaml), loaded once on first use."""
+    return Config.load()
+
+
+def __getattr__(name):
+    # `config` is resolved lazily so importing this module (e.g. just for Config) reads no files.
+    # Entry points may still replace it with `config_module.config = Config.load(path)`.
+    if name == "config":
+        return get_config()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -2,27 +2,77 @@ import asyncio
 import logging
 import random
 import os
-import json
+import sys
+import time
+import orjson
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Set, Optional
 
 import aiohttp
 from aiohttp import ClientTimeout
-from playwright.async_api import async_playwright, BrowserContext
+from playwright.async_api import async_playwright, BrowserContext, Page
 
 from . import config as config_module
 from .parsers import (
     parse_search_results,
     parse_article_details,
     fetch_comments_api,
+    close_comment_clients,
     parse_demographics,
     fetch_search_results_http,
+    Article,
 )
 from .storage import CSVExporter
+from .url_index import extract_url
+from .jsonl import iter_lines
 from .monitor import StatusMonitor
 
 logger = logging.getLogger(__name__)
 
+# Articles are timestamped in bursts; one isoformat per 100 ms window is plenty
+_NOW_ISO_GRANULARITY = 0.1
+_now_iso_cache = (float("-inf"), "")
+
+
+def _now_iso() -> str:
+    """datetime.now().isoformat(), reused for up to _NOW_ISO_GRANULARITY seconds."""
+    global _now_iso_cache
+    tick = time.monotonic()
+    if tick - _now_iso_cache[0] >= _NOW_ISO_GRANULARITY:
+        _now_iso_cache = (tick, datetime.now().isoformat())
+    return _now_iso_cache[1]
+
+
+def _iter_history(base_dir: str):
+    """Yields paths of `*articles*.jsonl` under base_dir, recursing with os.scandir."""
+    with os.scandir(base_dir) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _iter_history(entry.path)
+            elif "articles" in entry.name and entry.name.endswith(".jsonl"):
+                yield entry.path
+
+
+def _extract_history_urls(path: str):
+    """URLs of one history file. Runs on a pool thread; returns (urls, error or None)."""
+    urls: List[str] = []
+    try:
+        # Only the url is needed: regex fast path, orjson for anything unusual
+        for line in iter_lines(path):
+            # memmem check; lines without a url key never reach the regex/parser
+            if b'"url"' not in line:
+                continue
+            try:
+                url = extract_url(line)
+            except (orjson.JSONDecodeError, UnicodeDecodeError, KeyError, TypeError):
+                continue
+            if url:
+                urls.append(url)
+    except Exception as e:
+        return urls, str(e)
+    return urls, None
+
 
 class NaverNewsCrawler:
     """
@@ -33,8 +83,9 @@ class NaverNewsCrawler:
     """
 
     def __init__(self, run_id: Optional[str] = None):
-        self.results_articles: List[Dict[str, Any]] = []
-        self.results_comments: List[Dict[str, Any]] = []
+        # Records are persisted by the writer task; only their counts stay in memory
+        self.articles_written = 0
+        self.comments_written = 0
         self.seen_urls: Set[str] = set()
         self.run_id = run_id or datetime.now().strftime("%Y%m%d_%H%M%S")
         self.exporter = CSVExporter(self.run_id)
@@ -43,8 +94,15 @@ class NaverNewsCrawler:
         self.article_buffer_size = config_module.config.storage.batch_size
         self.comment_buffer_size = config_module.config.storage.batch_size
         self.http_session: Optional[aiohttp.ClientSession] = None
-
-        self.article_sem = asyncio.Semaphore(config_module.config.crawler.article_sem)
+        # Batch files are written by one background task (see _writer_loop)
+        self._write_q: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+
+        # Articles flow from the search loop to article_sem long-lived workers (created in run())
+        self.article_workers = config_module.config.crawler.article_sem
+        self._article_queue: Optional[asyncio.Queue] = None
+        # Reusable pages for the demographics UI fallback (one slot per worker, opened on first use)
+        self._page_pool: Optional[asyncio.Queue] = None
         self.page_sem = asyncio.Semaphore(config_module.config.crawler.page_sem)
         self.forbidden_streak = 0
         self.stop_due_to_403 = False
@@ -73,23 +131,14 @@ class NaverNewsCrawler:
             return
 
         count = 0
-        for root, dirs, files in os.walk(base_dir):
-            for file in files:
-                if "articles" in file and file.endswith(".jsonl"):
-                    path = os.path.join(root, file)
-                    try:
-                        with open(path, "r", encoding="utf-8") as f:
-                            for line in f:
-                                try:
-                                    item = json.loads(line)
-                                    url = item.get("url")
-                                    if url:
-                                        self.seen_urls.add(url)
-                                        count += 1
-                                except:
-                                    pass
-                    except Exception as e:
-                        logger.warning(f"Failed to read history file {path}: {e}")
+        files = list(_iter_history(base_dir))
+        # Files are read/parsed concurrently; only the filter update happens here
+        with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1)) as executor:
+            for path, (urls, error) in zip(files, executor.map(_extract_history_urls, files)):
+                if error:
+                    logger.warning(f"Failed to read history file {path}: {error}")
+                self.seen_urls.update(urls)
+                count += len(urls)
         
         if count > 0:
             logger.info(f"Loaded {count} existing URLs from {base_dir} to avoid duplicates.")
@@ -105,91 +154,119 @@ class NaverNewsCrawler:
         # 1. Init browsert_stage("STARTING")
         self.monitor.set_stage("STARTING")
 
-        # Shared HTTP session for search + comments
-        timeout = ClientTimeout(total=config_module.config.crawler.http_total_timeout)
-        headers = {"User-Agent": config_module.config.crawler.user_agent}
-        async with aiohttp.ClientSession(headers=headers, timeout=timeout) as http_session:
-            self.http_session = http_session
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(headless=config_module.config.crawler.headless)
-                context = await browser.new_context(user_agent=config_module.config.crawler.user_agent)
-                self.monitor.set_stage("SEARCHING")
-
-                for keyword in config_module.config.search.keywords:
-                    if self.stop_due_to_403:
-                        break
+        self._write_q = asyncio.Queue()
+        self._writer_task = asyncio.create_task(self._writer_loop())
+
+        try:
+            # Shared HTTP session for search + comments
+            timeout = ClientTimeout(total=config_module.config.crawler.http_total_timeout)
+            headers = {"User-Agent": config_module.config.crawler.user_agent}
+            # Bounded keep-alive pool with cached DNS, sized from config
+            connector = aiohttp.TCPConnector(
+                limit=config_module.config.crawler.connector_limit,
+                limit_per_host=config_module.config.crawler.connector_limit_per_host,
+                ttl_dns_cache=config_module.config.crawler.dns_cache_ttl,
+            )
+            async with aiohttp.ClientSession(headers=headers, timeout=timeout, connector=connector) as http_session:
+                self.http_session = http_session
+                async with async_playwright() as p:
+                    browser = await p.chromium.launch(headless=config_module.config.crawler.headless)
+                    context = await browser.new_context(user_agent=config_module.config.crawler.user_agent)
+                    self.monitor.set_stage("SEARCHING")
+
+                    # Search keeps paging while workers process already-found articles
+                    self._article_queue = asyncio.Queue(maxsize=self.article_workers * 2)
+                    self._page_pool = asyncio.Queue()
+                    for _ in range(self.article_workers):
+                        self._page_pool.put_nowait(None)
+                    workers = [asyncio.create_task(self._article_worker(context)) for _ in range(self.article_workers)]
                     try:
-                        self.monitor.set_keyword(keyword)
-                        await self.process_keyword_search(context, http_session, keyword)
-                    except Exception as e:
-                        logger.error(f"Error processing keyword '{keyword}': {e}")
-                        self.stats["errors"].append({"step": f"keyword_{keyword}", "error": str(e)})
+                        for keyword in config_module.config.search.keywords:
+                            if self.stop_due_to_403:
+                                break
+                            try:
+                                self.monitor.set_keyword(keyword)
+                                await self.process_keyword_search(context, http_session, keyword)
+                            except Exception as e:
+                                logger.error(f"Error processing keyword '{keyword}': {e}")
+                                self.stats["errors"].append({"step": f"keyword_{keyword}", "error": str(e)})
+                                self.monitor.update_stats(self.stats)
+                    finally:
+                        # One sentinel per worker; queued articles are finished first
+                        for _ in workers:
+                            await self._article_queue.put(None)
+                        await asyncio.gather(*workers)
                         self.monitor.update_stats(self.stats)
 
-                await browser.close()
+                    await browser.close()
+        finally:
+            # Flush remaining buffers and wait for the writer to finish them
+            self.flush_buffers(force=True)
+            self._write_q.put_nowait(None)
+            await self._writer_task
+            self.exporter.close()
+            await close_comment_clients()
 
-        # Flush remaining buffers
-        self.flush_buffers(force=True)
         self.monitor.set_stage("COMPLETED")
         self.monitor.update_stats(self.stats)
+        self.monitor.flush()
         logger.info(f"Crawl finished. Stats: {self.stats}")
-        return self.results_articles, self.results_comments
+        return self.articles_written, self.comments_written
 
     async def process_keyword_search(self, context: BrowserContext, http_session: aiohttp.ClientSession, keyword: str):
+        # Shared by every article dict of this keyword; one object instead of one per record
+        keyword = sys.intern(keyword)
         logger.info(f"Searching for keyword: {keyword}")
+        # Config is frozen for the run: bind what the page loop reads
+        search_cfg = config_module.config.search
+        max_articles = config_module.config.filters.max_articles
+        page_load_timeout = config_module.config.crawler.page_load_timeout
         page = await context.new_page()
-        base_url = f"https://search.naver.com/search.naver?where=news&query={keyword}&sort={config_module.config.search.sort_method}"
-        if config_module.config.search.start_date and config_module.config.search.end_date:
-            base_url += f"&pd=3&ds={config_module.config.search.start_date}&de={config_module.config.search.end_date}"
+        base_url = f"https://search.naver.com/search.naver?where=news&query={keyword}&sort={search_cfg.sort_method}"
+        if search_cfg.start_date and search_cfg.end_date:
+            base_url += f"&pd=3&ds={search_cfg.start_date}&de={search_cfg.end_date}"
 
         prev_count: Optional[int] = None
         low_streak = 0
         current_page = 0
-        total_pages = config_module.config.search.max_pages
+        total_pages = search_cfg.max_pages
 
         try:
             while current_page < total_pages:
-                if self.stop_due_to_403 or self.stats["collected"] >= config_module.config.filters.max_articles:
+                if self.stop_due_to_403 or self.stats["collected"] >= max_articles:
                     break
 
                 current_page += 1
                 start_idx = (current_page - 1) * 10 + 1
                 page_url = f"{base_url}&start={start_idx}"
 
-                # HTTP fetch
-                articles = await fetch_search_results_http(http_session, keyword, current_page - 1)
-                fallback_needed = False
-
-                # [FIX]: Check for invalid data (e.g. Unknown Date) that implies JS-only content
-                if any(a.get("date") == "Unknown Date" or a.get("title") == "네이버뉴스" for a in articles):
-                    logger.warning(f"HTTP fetch returned invalid data (Unknown Date) for page {current_page}. Triggering Playwright fallback.")
-                    articles = [] # Force fallback
+                # HTTP fetch; 상대적 급락이면 HTTP 재시도 (가장 많은 결과 유지)
+                low_threshold = prev_count * search_cfg.low_drop_ratio if prev_count else 0
+                articles = []
+                for _ in range(search_cfg.http_retry_on_low + 1):
+                    fetched = await fetch_search_results_http(http_session, keyword, current_page - 1)
+                    # [FIX]: Check for invalid data (e.g. Unknown Date) that implies JS-only content
+                    if any(a.date == "Unknown Date" or a.title == "네이버뉴스" for a in fetched):
+                        logger.warning(f"HTTP fetch returned invalid data (Unknown Date) for page {current_page}. Triggering Playwright fallback.")
+                        articles = []  # Force fallback
+                        break
+                    if len(fetched) > len(articles):
+                        articles = fetched
+                    if not articles or len(articles) >= low_threshold:
+                        break
 
-                if len(articles) == 0:
+                fallback_needed = False
+                if not articles:
                     fallback_needed = True  # selector 0건 → 즉시 폴백
                 else:
-                    # 상대적 급락 감지
-                    if prev_count and len(articles) < prev_count * config_module.config.search.low_drop_ratio:
-                        # HTTP 한 번 더 재시도
-                        for _ in range(config_module.config.search.http_retry_on_low):
-                            retry_articles = await fetch_search_results_http(http_session, keyword, current_page - 1)
-                            if len(retry_articles) > len(articles):
-                                articles = retry_articles
-                                break
-                        if len(articles) < prev_count * config_module.config.search.low_drop_ratio:
-                            low_streak += 1
-                        else:
-                            low_streak = 0
-                    else:
-                        low_streak = 0
-
-                    if low_streak >= config_module.config.search.low_streak_trigger:
+                    low_streak = low_streak + 1 if len(articles) < low_threshold else 0
+                    if low_streak >= search_cfg.low_streak_trigger:
                         fallback_needed = True
                         low_streak = 0
 
                 if fallback_needed:
                     self.stats["fallback_search"] += 1
-                    await page.goto(page_url, wait_until="domcontentloaded", timeout=config_module.config.crawler.page_load_timeout)
+                    await page.goto(page_url, wait_until="domcontentloaded", timeout=page_load_timeout)
                     await asyncio.sleep(random.uniform(0.8, 1.2))
                     articles = await parse_search_results(page)
 
@@ -200,38 +277,80 @@ class NaverNewsCrawler:
 
                 logger.info(f"Page {current_page}: {len(articles)} articles")
 
-                tasks = []
+                # Workers may have reached the limit while this page was fetched
+                if self.stop_due_to_403 or self.stats["collected"] >= max_articles:
+                    break
+
+                queued = 0
                 for article in articles:
-                    if self.stats["collected"] >= config_module.config.filters.max_articles or self.stop_due_to_403:
-                        break
-                    if article["url"] in self.seen_urls:
+                    url = article.url
+                    if url in self.seen_urls:
                         continue
-                    self.seen_urls.add(article["url"])
+                    self.seen_urls.add(url)
                     self.stats["scanned"] += 1
-                    tasks.append(asyncio.create_task(self._process_article_guard(context, article, keyword)))
+                    # Blocks only while the queue is full (backpressure)
+                    await self._article_queue.put((article, keyword))
+                    queued += 1
+                    # Counters only change while we were suspended in put()
+                    if self.stop_due_to_403 or self.stats["collected"] >= max_articles:
+                        break
 
-                if tasks:
-                    await asyncio.gather(*tasks)
+                if queued:
                     self.monitor.update_stats(self.stats)
 
         finally:
             await page.close()
 
-    async def _process_article_guard(self, context: BrowserContext, article_meta: Dict[str, Any], keyword: str):
-        async with self.article_sem:
-            await self.process_article(context, article_meta, keyword)
+    async def _article_worker(self, context: BrowserContext):
+        """Processes queued (article_meta, keyword) items until it receives the None sentinel."""
+        max_articles = config_module.config.filters.max_articles
+        while True:
+            item = await self._article_queue.get()
+            if item is None:
+                return
+            # Keep draining, but skip work once the run has enough articles or is blocked
+            if self.stop_due_to_403 or self.stats["collected"] >= max_articles:
+                continue
+            article_meta, keyword = item
+            try:
+                await self.process_article(context, article_meta, keyword)
+            except Exception as e:
+                logger.error(f"Error processing article {article_meta.url}: {e}")
+                self.stats["errors"].append({"url": article_meta.url, "type": "article_error", "error": str(e)})
+
+    async def _acquire_page(self, context: BrowserContext) -> Page:
+        """Takes a page from the pool, opening one for an empty slot or replacing a closed one."""
+        page = await self._page_pool.get()
+        if page is None or page.is_closed():
+            page = await context.new_page()
+        return page
+
+    def _prefilter(self, article_meta: Article) -> bool:
+        """
+        Checks that need no network call, run before the comment API.
+        The run must still want articles, and the comment API needs both oid and aid.
+        Duplicates are already dropped via seen_urls when the article is queued.
+        """
+        if self.stop_due_to_403 or self.stats["collected"] >= config_module.config.filters.max_articles:
+            return False
+        return bool(article_meta.oid and article_meta.aid)
 
-    async def process_article(self, context: BrowserContext, article_meta: Dict[str, Any], keyword: str):
-        url = article_meta["url"]
-        oid = article_meta.get("oid")
-        aid = article_meta.get("aid")
-        aid = article_meta.get("aid")
-        title = article_meta.get("title")
-        date_str = article_meta.get("date", "Unknown")
+    async def process_article(self, context: BrowserContext, article_meta: Article, keyword: str):
+        if not self._prefilter(article_meta):
+            return
+        filters_cfg = config_module.config.filters
+        crawler_cfg = config_module.config.crawler
+        url = article_meta.url
+        oid = article_meta.oid
+        aid = article_meta.aid
+        title = article_meta.title
+        # Few distinct dates per run, many articles each
+        date_str = sys.intern(article_meta.date or "Unknown")
+        demog: Dict[str, Any] = {}
 
         data = {
             "run_id": self.run_id,
-            "collected_at_kst": datetime.now().isoformat(),
+            "collected_at_kst": _now_iso(),
             "published_at": date_str,
             "keyword": keyword,
             "title": title,
@@ -251,19 +370,19 @@ class NaverNewsCrawler:
             comments, social_meta = await fetch_comments_api(
                 oid,
                 aid,
-                max_comments=config_module.config.filters.max_comments,
+                max_comments=filters_cfg.max_comments,
                 session=self.http_session,
                 page_sem=self.page_sem,
-                stop_on_403=config_module.config.crawler.stop_on_403_run,
-                max_retry_429=config_module.config.crawler.max_retry_429,
-                max_retry_5xx=config_module.config.crawler.max_retry_5xx,
-                backoff_base=config_module.config.crawler.backoff_base,
-                timeout=config_module.config.crawler.http_total_timeout,
+                stop_on_403=crawler_cfg.stop_on_403_run,
+                max_retry_429=crawler_cfg.max_retry_429,
+                max_retry_5xx=crawler_cfg.max_retry_5xx,
+                backoff_base=crawler_cfg.backoff_base,
+                timeout=crawler_cfg.http_total_timeout,
             )
         except PermissionError:
             self.stats["forbidden"] += 1
             self.forbidden_streak += 1
-            if config_module.config.crawler.stop_on_403_run and self.forbidden_streak >= 2:
+            if crawler_cfg.stop_on_403_run and self.forbidden_streak >= 2:
                 self.stop_due_to_403 = True
             return
         except Exception as e:
@@ -306,21 +425,21 @@ class NaverNewsCrawler:
         need_ui_fallback = False
         if not data.get("demographic_available"):
             need_ui_fallback = True
-        elif comment_count_api < config_module.config.filters.comment_threshold and config_module.config.filters.demographics_ui_fallback:
+        elif comment_count_api < filters_cfg.comment_threshold and filters_cfg.demographics_ui_fallback:
              # API count is low, double check with UI if enabled
              need_ui_fallback = True
 
         # Debug log
-        # logger.info(f"Processing {url}: need_fallback={need_ui_fallback}, config_fallback={config_module.config.filters.demographics_ui_fallback}")
+        # logger.info(f"Processing {url}: need_fallback={need_ui_fallback}, config_fallback={filters_cfg.demographics_ui_fallback}")
 
         # Initialize comment_count_ui for safe access later
         comment_count_ui = comment_count_api
 
-        if need_ui_fallback and config_module.config.filters.demographics_ui_fallback:
+        if need_ui_fallback and filters_cfg.demographics_ui_fallback:
             self.stats["fallback_demographics"] += 1
-            article_page = await context.new_page()
+            article_page = await self._acquire_page(context)
             try:
-                await article_page.goto(url, wait_until="domcontentloaded", timeout=config_module.config.crawler.page_load_timeout)
+                await article_page.goto(url, wait_until="domcontentloaded", timeout=crawler_cfg.page_load_timeout)
                 await asyncio.sleep(random.uniform(0.5, 1.0))
                 demog = await parse_demographics(article_page)
                 # Only update if valid
@@ -338,7 +457,7 @@ class NaverNewsCrawler:
                 logger.error(f"Demographics fallback failed {url}: {e}")
                 self.stats["errors"].append({"url": url, "type": "demographic_error", "error": str(e)})
             finally:
-                await article_page.close()
+                self._page_pool.put_nowait(article_page)
 
         data.update(
             {
@@ -348,18 +467,14 @@ class NaverNewsCrawler:
         )
 
         # 4. Filter check
-        # Update demographics if valid
-        if demog.get("demographic_available"):
-             data.update(demog)
-
         if not self._check_filters(data, demog):
             logger.info(f"Filtered out: {url} (Comments: {comment_count_ui}, Demog: {data.get('demographic_available')})")
             return
 
         # 5. [NEW] Stop if only_urls is True
-        if getattr(config_module.config.crawler, "only_urls", False):
+        if crawler_cfg.only_urls:
             logger.info(f"[Meta-Only] Collected article metadata: {title}")
-            self.results_articles.append(data)
+            self.articles_written += 1
             self.stats["collected"] += 1
             self.stats["matched"] += 1
             
@@ -380,8 +495,8 @@ class NaverNewsCrawler:
         self.stats["comments_total"] += len(comments)
         self.stats["collected"] += 1
         logger.info(f"Collected {url} [{date_str}] (Comments: {comment_count_api})")
-        self.results_articles.append(data)
-        self.results_comments.extend(comments)
+        self.articles_written += 1
+        self.comments_written += len(comments)
 
         # Buffering + batch write
         self.article_buffer.append(data)
@@ -394,13 +509,40 @@ class NaverNewsCrawler:
         self.flush_buffers()
 
     def flush_buffers(self, force: bool = False):
-        if force or len(self.article_buffer) >= self.article_buffer_size:
-            self.exporter.save_articles_batch(self.article_buffer)
+        """Hands full (or, with force, any) buffers to the writer task; never touches disk itself."""
+        if self.article_buffer and (force or len(self.article_buffer) >= self.article_buffer_size):
+            self._write_q.put_nowait(("articles", self.article_buffer[:]))
             self.article_buffer.clear()
-        if force or len(self.comment_buffer) >= self.comment_buffer_size:
-            self.exporter.save_comments_batch(self.comment_buffer)
+        if self.comment_buffer and (force or len(self.comment_buffer) >= self.comment_buffer_size):
+            self._write_q.put_nowait(("comments", self.comment_buffer[:]))
             self.comment_buffer.clear()
 
+    async def _writer_loop(self):
+        """
+        Writes queued batches off the event loop until the None sentinel.
+        Batches that piled up while a write was running are coalesced into one file per kind,
+        and both kinds are written in a single thread hand-off.
+        """
+        done = False
+        while not done:
+            items = [await self._write_q.get()]
+            while not self._write_q.empty():
+                items.append(self._write_q.get_nowait())
+            pending: Dict[str, List[Dict[str, Any]]] = {"articles": [], "comments": []}
+            for item in items:
+                if item is None:
+                    done = True
+                    continue
+                kind, rows = item
+                pending[kind].extend(rows)
+            if pending["articles"] or pending["comments"]:
+                await asyncio.to_thread(self._save_pending, pending)
+
+    def _save_pending(self, pending: Dict[str, List[Dict[str, Any]]]):
+        # Runs on a worker thread; save_*_batch skip empty lists
+        self.exporter.save_articles_batch(pending["articles"])
+        self.exporter.save_comments_batch(pending["comments"])
+
     def _check_filters(self, data: Dict[str, Any], demog: Dict[str, Any]) -> bool:
         """
         Check if article meets filter criteria (Keywords, Comment Count).
@@ -442,5 +584,11 @@ if __name__ == '__main__':
         config_module.config = config_module.Config.load(args.config)
 
     crawler = NaverNewsCrawler()
-    asyncio.run(crawler.run())
+    # uvloop is optional (not available on Windows); the default loop works the same, only slower
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(crawler.run())
+    else:
+        uvloop.run(crawler.run())
 
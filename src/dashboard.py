@@ -4,7 +4,14 @@ import os
 import time
 import subprocess
 import sys
+import orjson
 from config import config
+from jsonl import iter_lines
+
+try:
+    from streamlit_autorefresh import st_autorefresh
+except ImportError:
+    st_autorefresh = None
 
 st.set_page_config(
     page_title="Naver News Pension Crawler Dashboard",
@@ -28,25 +35,52 @@ except:
 ARTICLES_CSV = os.path.join(OUTPUT_DIR, config.storage.articles_filename)
 COMMENTS_CSV = os.path.join(OUTPUT_DIR, config.storage.comments_filename)
 
+REFRESH_SECONDS = 10
+# Only the fields the dashboard renders are kept in the DataFrames
+ARTICLE_VIEW_COLUMNS = [
+    "collected_at_kst", "published_at", "keyword", "title", "url",
+    "comment_count", "comments_collected", "comments_collected_n",
+    "male_ratio", "female_ratio",
+    "age_10s", "age_20s", "age_30s", "age_40s", "age_50s", "age_60_plus",
+    "demographic_available",
+]
+COMMENT_VIEW_COLUMNS = ["article_url", "comment_id", "comment_text", "comment_created_at"]
+
+
+def _read_jsonl(path, columns):
+    """Outputs are JSONL; parse each line with orjson and keep only `columns`."""
+    rows = []
+    for line in iter_lines(path):
+        if not line.strip():
+            continue
+        try:
+            record = orjson.loads(line)
+        except orjson.JSONDecodeError:
+            continue
+        rows.append({c: record.get(c) for c in columns})
+    return pd.DataFrame(rows, columns=columns)
+
 
+@st.cache_data(ttl=REFRESH_SECONDS, show_spinner=False)
 def load_data():
-    """Load data from CSVs safely."""
+    """Load data from the output files safely. Cached, so reruns within the TTL do not re-read disk."""
     articles = pd.DataFrame()
     comments = pd.DataFrame()
+    errors = []
 
     if os.path.exists(ARTICLES_CSV):
         try:
-            articles = pd.read_csv(ARTICLES_CSV, encoding=config.storage.encoding)
+            articles = _read_jsonl(ARTICLES_CSV, ARTICLE_VIEW_COLUMNS)
         except Exception as e:
-            st.error(f"Error loading articles: {e}")
+            errors.append(f"Error loading articles: {e}")
 
     if os.path.exists(COMMENTS_CSV):
         try:
-            comments = pd.read_csv(COMMENTS_CSV, encoding=config.storage.encoding)
+            comments = _read_jsonl(COMMENTS_CSV, COMMENT_VIEW_COLUMNS)
         except Exception as e:
-            st.error(f"Error loading comments: {e}")
+            errors.append(f"Error loading comments: {e}")
 
-    return articles, comments
+    return articles, comments, errors
 
 
 # Sidebar for controls
@@ -97,10 +131,16 @@ if st.session_state["crawler_pid"]:
         st.session_state["crawler_pid"] = None
         st.rerun()
 
-auto_refresh = st.sidebar.checkbox("Auto-refresh (10s)", value=True)
+auto_refresh = st.sidebar.checkbox(f"Auto-refresh ({REFRESH_SECONDS}s)", value=True)
+if auto_refresh and st_autorefresh is not None:
+    # Browser-side timer triggers the rerun; the script itself never blocks
+    st_autorefresh(interval=REFRESH_SECONDS * 1000, key="tick")
 
-# Load Data
-articles, comments = load_data()
+# Load Data (cached frames are shared between reruns; copy before mutating)
+articles, comments, load_errors = load_data()
+articles = articles.copy()
+for err in load_errors:
+    st.error(err)
 
 # Metrics
 col1, col2, col3, col4 = st.columns(4)
@@ -155,7 +195,7 @@ if not comments.empty:
     st.subheader("Recent Comments")
     st.dataframe(comments.tail(10))
 
-# Auto refresh logic
-if auto_refresh:
-    time.sleep(10)
+# Auto refresh logic (fallback when streamlit-autorefresh is not installed)
+if auto_refresh and st_autorefresh is None:
+    time.sleep(REFRESH_SECONDS)
     st.rerun()
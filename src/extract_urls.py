@@ -1,10 +1,17 @@
 import os
-import json
-import glob
+import re
+import sys
+import orjson
 import argparse
 import logging
 from datetime import datetime
-from typing import List, Set, Dict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional, Set, Tuple
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.jsonl import iter_lines
 
 # Configure logging
 logging.basicConfig(
@@ -14,6 +21,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# First path component starting with run_, e.g. .../run_20250101_.../articles_batch_...jsonl
+RUN_RE = re.compile(r"(?:^|[\\/])(run_[^\\/]+)")
+
 DEFAULT_DIRS = [
     "GPR", 
     "GPR_2025", 
@@ -22,13 +32,68 @@ DEFAULT_DIRS = [
     "GPR_IMPACT_FULL"
 ]
 
-def extract_all_urls(base_dirs: List[str], output_file: str, verbose: bool = False):
+def iter_batch_files(root: str) -> Iterator[str]:
+    """Yields `articles_batch*.jsonl` paths under root. os.scandir dirents, no glob/fnmatch."""
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    name = entry.name
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif name.startswith("articles_batch") and name.endswith(".jsonl"):
+                        yield entry.path
+        except OSError as e:
+            logger.warning(f"Cannot list {directory}: {e}")
+
+
+def parse_one_file(file_path: str) -> Tuple[List[str], int, List[str], Optional[str]]:
+    """
+    Unique URLs of one history file, in first-seen order. Runs in a worker process;
+    returns (urls, in-file duplicates, per-line warnings, read error or None).
+    Duplicates within the file are dropped here, so they are never pickled back and the
+    parent's set only arbitrates between files.
+    """
+    urls: List[str] = []
+    local_seen: Set[str] = set()
+    duplicates = 0
+    warnings: List[str] = []
+    try:
+        # Raw byte lines (mmap scan, no text decode); orjson takes bytes directly
+        for line_num, line in enumerate(iter_lines(file_path), 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                url = orjson.loads(line).get("url")
+            except orjson.JSONDecodeError as e:
+                warnings.append(f"JSON Error in {file_path}:{line_num} - {e}")
+                continue
+            if not url:
+                continue
+            if url in local_seen:
+                duplicates += 1
+            else:
+                local_seen.add(url)
+                urls.append(url)
+    except Exception as e:
+        return urls, duplicates, warnings, str(e)
+    return urls, duplicates, warnings, None
+
+
+def extract_all_urls(base_dirs: List[str], output_file: str, verbose: bool = False,
+                     max_workers: Optional[int] = None):
     if verbose:
         logger.setLevel(logging.DEBUG)
     
+    # Exact dedup: this output is the canonical URL list, so no URL may be dropped by mistake
     seen_urls: Set[str] = set()
     total_count = 0
     duplicate_count = 0
+    # One timestamp for the whole extraction run
+    extracted_at = datetime.now().isoformat()
     
     logger.info(f"Scanning directories: {base_dirs}")
     
@@ -37,7 +102,9 @@ def extract_all_urls(base_dirs: List[str], output_file: str, verbose: bool = Fal
     if out_dir and not os.path.exists(out_dir):
         os.makedirs(out_dir, exist_ok=True)
 
-    with open(output_file, "w", encoding="utf-8") as out_f:
+    # Files are parsed in worker processes; dedup and writing stay in this process
+    with open(output_file, "wb", buffering=1 << 20) as out_f, \
+         ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as pool:
         for base_dir in base_dirs:
             if not os.path.exists(base_dir):
                 logger.warning(f"Directory not found: {base_dir}")
@@ -46,58 +113,40 @@ def extract_all_urls(base_dirs: List[str], output_file: str, verbose: bool = Fal
             logger.info(f"Scanning {base_dir}...")
             
             # Recursive search for articles_batch*.jsonl
-            # Use glob with recursive=True
-            pattern = os.path.join(base_dir, "**", "articles_batch*.jsonl")
-            files = glob.glob(pattern, recursive=True)
+            files = list(iter_batch_files(base_dir))
             
             if not files:
                 logger.debug(f"No article files found in {base_dir}")
                 continue
+
+            # map keeps file order, so output order matches the sequential scan
+            for file_path, (urls, local_dups, warnings, error) in zip(files, pool.map(parse_one_file, files, chunksize=4)):
+                logger.debug(f"Read {file_path}: {len(urls)} urls")
+                duplicate_count += local_dups
+                for warning in warnings:
+                    logger.warning(warning)
+                if error:
+                    logger.error(f"Failed to read file {file_path}: {error}")
                 
-            for file_path in files:
-                logger.debug(f"Reading {file_path}...")
-                
-                # Extract simple run_id from filename or path if possible
-                # e.g. .../run_20250101_.../articles_batch_...jsonl
-                # Try to find 'run_' in path parts
-                parts = os.path.normpath(file_path).split(os.sep)
-                run_id_guess = "unknown"
-                for part in parts:
-                    if part.startswith("run_"):
-                        run_id_guess = part
-                        break
-                
-                try:
-                    with open(file_path, "r", encoding="utf-8") as in_f:
-                        for line_num, line in enumerate(in_f, 1):
-                            line = line.strip()
-                            if not line:
-                                continue
-                            try:
-                                data = json.loads(line)
-                                url = data.get("url")
-                                
-                                if url:
-                                    if url not in seen_urls:
-                                        seen_urls.add(url)
-                                        
-                                        # Metadata object
-                                        meta = {
-                                            "url": url,
-                                            "source_file": file_path,
-                                            "run_id": run_id_guess,
-                                            "extracted_at": datetime.now().isoformat()
-                                        }
-                                        
-                                        out_f.write(json.dumps(meta, ensure_ascii=False) + "\n")
-                                        total_count += 1
-                                    else:
-                                        duplicate_count += 1
-                                        
-                            except json.JSONDecodeError as e:
-                                logger.warning(f"JSON Error in {file_path}:{line_num} - {e}")
-                except Exception as e:
-                    logger.error(f"Failed to read file {file_path}: {e}")
+                # Extract simple run_id from the path if possible
+                m = RUN_RE.search(file_path)
+                run_id_guess = m.group(1) if m else "unknown"
+
+                # Everything but the url is fixed for the file: encode it once, splice the url in per line
+                tail = b"," + orjson.dumps({
+                    "source_file": file_path,
+                    "run_id": run_id_guess,
+                    "extracted_at": extracted_at
+                })[1:] + b"\n"
+
+                for url in urls:
+                    if url not in seen_urls:
+                        seen_urls.add(url)
+                        # Metadata object: {"url", "source_file", "run_id", "extracted_at"}
+                        out_f.write(b'{"url":' + orjson.dumps(url) + tail)
+                        total_count += 1
+                    else:
+                        duplicate_count += 1
 
     logger.info(f"Extraction complete.")
     logger.info(f"Total unique URLs: {total_count}")
@@ -109,7 +158,8 @@ if __name__ == "__main__":
     parser.add_argument("--dirs", nargs="+", default=DEFAULT_DIRS, help="List of base directories to scan.")
     parser.add_argument("--output", type=str, default="all_collected_urls.jsonl", help="Output JSONL filename.")
     parser.add_argument("--verbose", action="store_true", help="Enable verbose logging.")
+    parser.add_argument("--workers", type=int, default=None, help="Parser processes (default: CPU count).")
     
     args = parser.parse_args()
     
-    extract_all_urls(args.dirs, args.output, args.verbose)
+    extract_all_urls(args.dirs, args.output, args.verbose, args.workers)
@@ -1,10 +1,20 @@
 import asyncio
 import argparse
-import json
 import os
+import sys
 import logging
-from typing import List, Set
-from playwright.async_api import async_playwright, BrowserContext
+from typing import List, Optional, Set
+from urllib.parse import urlsplit
+import orjson
+from playwright.async_api import async_playwright, BrowserContext, Page, Route
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.jsonl import JsonlWriter, iter_lines
+from src.url_index import extract_url
+from src.selectors import DemographicSelectors
 
 # Logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -12,115 +22,193 @@ logger = logging.getLogger(__name__)
 
 INPUT_FILE = "GPR_URLS/all_article_urls.jsonl"
 OUTPUT_FILE = "GPR_URLS/stats_urls.jsonl"
-SEMAPHORE_LIMIT = 3
+# Every URL checked successfully (match or not), so --resume can skip it; failed checks are retried
+PROCESSED_FILE = "GPR_URLS/stats_processed_urls.jsonl"
+# Only Naver-hosted articles have the comment demographics chart (news.naver.com redirects to n.news)
+ALLOWED_HOSTS = frozenset({"n.news.naver.com", "news.naver.com"})
+SEMAPHORE_LIMIT = 3  # default; conservative to avoid DOS behavior (see rules), raise with --workers
+MAX_WORKERS = 20     # hard cap on concurrent pages
+WORKERS_PER_CONTEXT = 5  # pages sharing one BrowserContext
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font", "stylesheet"})
+STATS_WAIT_MS = 2500
+# Scrolls to the bottom (lazy-loaded comments/stats) and resolves as soon as the chart exists.
+# The selector is passed as the argument (DemographicSelectors.CHART_AREA), not copied into the script.
+STATS_PROBE_JS = """(chartSel) => {
+    window.scrollTo(0, document.body.scrollHeight);
+    return document.querySelector(chartSel) !== null;
+}"""
 
-async def check_url_for_stats(context: BrowserContext, url: str) -> bool:
-    page = await context.new_page()
-    has_stats = False
-    try:
-        # Block resources to speed up
-        await page.route("**/*", lambda route: route.abort() 
-                         if route.request.resource_type in ["image", "media", "font"] 
-                         else route.continue_())
+async def block_heavy(route: Route):
+    """Context-wide route handler: drop assets the stats check doesn't need."""
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+async def open_worker_page(context: BrowserContext) -> Page:
+    """One page per worker, reused for every URL it checks. Resource blocking comes from the context."""
+    return await context.new_page()
 
+async def check_url_for_stats(page: Page, url: str) -> Optional[bool]:
+    """
+    True if the article shows the stats chart, False if it loaded without one,
+    None if the check itself failed (navigation timeout, network error, crashed page).
+    """
+    try:
         await page.goto(url, wait_until="domcontentloaded", timeout=15000)
-        
-        # Scroll to bottom to trigger lazy loading of comments/stats
-        await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-        await asyncio.sleep(1.0) # Wait for JS to render
-        
-        # Check for chart container
-        # Selector from src/selectors.py: DemographicSelectors.CHART_AREA = "div.u_cbox_chart_cont"
-        # Sometimes need to scroll specifically to comment area?
-        # Let's try to wait for it briefly
-        try:
-            await page.locator("div.u_cbox_chart_cont").wait_for(state="visible", timeout=2000)
-            has_stats = True
-        except:
-            # Last ditch: check if element exists even if not fully visible/animated
-            if await page.locator("div.u_cbox_chart_cont").count() > 0:
-                 has_stats = True
-            
     except Exception as e:
-        logger.debug(f"Error checking {url}: {e}")
+        logger.warning(f"Error loading {url}: {e}")
+        return None
+
+    # No fixed sleep: poll in the page and return the moment the chart container appears
+    try:
+        await page.wait_for_function(
+            STATS_PROBE_JS, arg=DemographicSelectors.CHART_AREA, timeout=STATS_WAIT_MS, polling=100
+        )
+        return True
+    except PlaywrightTimeoutError:
+        return False
+    except Exception as e:
+        logger.warning(f"Error checking {url}: {e}")
+        return None
+
+async def worker(sem, context, queue, writer: JsonlWriter, processed: JsonlWriter):
+    """Checks queued (line, url) items until it receives the None sentinel."""
+    page = await open_worker_page(context)
+    try:
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            line, url = item
+            try:
+                async with sem:
+                    if page.is_closed():
+                        # Crashed or closed by the site; replace it and keep going
+                        page = await open_worker_page(context)
+                    has_stats = await check_url_for_stats(page, url)
+                    
+                if has_stats is None:
+                    # Not recorded as processed, so --resume checks it again
+                    continue
+                if has_stats:
+                    logger.info(f"[MATCH] Stats found: {url}")
+                    # Single writer task owns the file handle; no lock or reopen per hit
+                    await writer.put(line)
+                else:
+                    # logger.info(f"[SKIP] No stats: {url}")
+                    print(".", end="", flush=True) # Progress dot
+                await processed.put(b'{"url":' + orjson.dumps(url) + b"}")
+                    
+            except Exception as e:
+                logger.error(f"Worker error: {e}")
     finally:
         await page.close()
-        
-    return has_stats
 
-async def worker(sem, context, queue, stats_file):
-    while not queue.empty():
-        line = await queue.get()
-        try:
-            data = json.loads(line)
-            url = data["url"]
-            
-            async with sem:
-                has_stats = await check_url_for_stats(context, url)
-                
-            if has_stats:
-                logger.info(f"[MATCH] Stats found: {url}")
-                async with stats_file_lock: # Minimal locking manual approach or just use append
-                     # In asyncio single threaded loop, append is safe usually? 
-                     # Actually standard file I/O is blocking.
-                     # But for this simple script, we can just append.
-                     with open(OUTPUT_FILE, "a", encoding="utf-8") as f:
-                         f.write(json.dumps(data, ensure_ascii=False) + "\n")
-            else:
-                # logger.info(f"[SKIP] No stats: {url}")
-                print(".", end="", flush=True) # Progress dot
-                
-        except Exception as e:
-            logger.error(f"Worker error: {e}")
-        finally:
-            queue.task_done()
+def load_processed(path: str) -> Set[str]:
+    """URLs checked by earlier runs (exact: an unchecked URL is never skipped)."""
+    seen: Set[str] = set()
+    if os.path.exists(path):
+        for line in iter_lines(path):
+            try:
+                seen.add(extract_url(line))
+            except (orjson.JSONDecodeError, UnicodeDecodeError, KeyError, TypeError):
+                continue
+    return seen
 
-# Global lock for file writing in case we expand to threads (though asyncio is single threaded)
-stats_file_lock = asyncio.Lock()
-
-async def main():
-    # Load URLs
-    urls = []
-    if os.path.exists(INPUT_FILE):
-        with open(INPUT_FILE, "r", encoding="utf-8") as f:
-            for line in f:
-                if line.strip():
-                    urls.append(line.strip())
-    
-    logger.info(f"Loaded {len(urls)} URLs to check.")
+async def main(workers: int = SEMAPHORE_LIMIT, resume: bool = False):
+    workers = max(1, min(workers, MAX_WORKERS))
+    if not os.path.exists(INPUT_FILE):
+        logger.warning(f"Input not found: {INPUT_FILE}")
     
     # Init output
     os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
-    # Don't overwrite if existing? Optional. User wants to filter. 
-    # Let's overwrite to start fresh or append?
-    # Let's clear it first to avoid duplicates from previous failed runs.
-    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-        pass
+    if resume:
+        # Keep earlier matches and skip every URL that was already checked
+        done = await asyncio.to_thread(load_processed, PROCESSED_FILE)
+        logger.info(f"Resuming: {len(done)} URLs already checked.")
+    else:
+        # Clear outputs first to avoid duplicates from previous failed runs.
+        done = None
+        for path in (OUTPUT_FILE, PROCESSED_FILE):
+            with open(path, "w", encoding="utf-8") as f:
+                pass
+    writer = JsonlWriter(OUTPUT_FILE)
+    writer.start()
+    processed = JsonlWriter(PROCESSED_FILE)
+    processed.start()
         
     async with async_playwright() as p:
         browser = await p.chromium.launch(headless=True)
-        context = await browser.new_context(
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/115.0.0.0 Safari/537.36"
-        )
+        # One context per WORKERS_PER_CONTEXT workers, so many pages do not share one context
+        num_contexts = -(-workers // WORKERS_PER_CONTEXT)
+        contexts = [
+            await browser.new_context(
+                user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/115.0.0.0 Safari/537.36"
+            )
+            for _ in range(num_contexts)
+        ]
+        # Block resources to speed up; registered once per context, applies to all its pages
+        for context in contexts:
+            await context.route("**/*", block_heavy)
         
-        queue = asyncio.Queue()
-        for u in urls:
-            queue.put_nowait(u)
+        # URLs are streamed from disk; the bounded queue keeps only a few lines in memory
+        queue = asyncio.Queue(maxsize=workers * 4)
             
-        sem = asyncio.Semaphore(SEMAPHORE_LIMIT)
+        sem = asyncio.Semaphore(workers)
+        logger.info(f"Checking with {workers} workers across {num_contexts} browser context(s).")
         
         tasks = []
-        for _ in range(SEMAPHORE_LIMIT):
-            tasks.append(asyncio.create_task(worker(sem, context, queue, OUTPUT_FILE)))
-            
-        await queue.join()
-        
-        for task in tasks:
-            task.cancel()
+        for i in range(workers):
+            tasks.append(asyncio.create_task(worker(sem, contexts[i % num_contexts], queue, writer, processed)))
+
+        async def feed():
+            count = skipped = 0
+            try:
+                if os.path.exists(INPUT_FILE):
+                    for line in iter_lines(INPUT_FILE):
+                        line = line.strip()
+                        if not line:
+                            continue
+                        try:
+                            url = orjson.loads(line)["url"]
+                            # Cheap string checks first: no page load for hosts without charts or done URLs
+                            allowed = urlsplit(url).netloc in ALLOWED_HOSTS
+                        except (orjson.JSONDecodeError, KeyError, AttributeError, TypeError, ValueError) as e:
+                            logger.error(f"Bad input line: {e}")
+                            continue
+                        if not allowed or (done is not None and url in done):
+                            skipped += 1
+                            continue
+                        await queue.put((line, url))
+                        count += 1
+            except OSError as e:
+                logger.error(f"Failed to read {INPUT_FILE}: {e}")
+            finally:
+                logger.info(f"Queued {count} URLs to check ({skipped} skipped before navigation).")
+                # Always release the workers, even if reading the input failed
+                for _ in tasks:
+                    await queue.put(None)
+        feeder = asyncio.create_task(feed())
+
+        try:
+            # Workers close their pages before the browser goes away
+            await asyncio.gather(*tasks)
+        finally:
+            feeder.cancel()
             
         await browser.close()
+
+    await writer.close()
+    await processed.close()
         
     logger.info("Filtering Complete.")
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Keep only URLs whose article shows demographic stats.")
+    parser.add_argument("--workers", type=int, default=SEMAPHORE_LIMIT,
+                        help=f"Concurrent pages (default {SEMAPHORE_LIMIT}, max {MAX_WORKERS}).")
+    parser.add_argument("--resume", action="store_true",
+                        help="Append to the existing output and skip URLs checked by earlier runs.")
+    args = parser.parse_args()
+    asyncio.run(main(args.workers, args.resume))
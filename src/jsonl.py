@@ -0,0 +1,152 @@
+import os
+import mmap
+import asyncio
+import logging
+from typing import Callable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def iter_lines(path: str) -> Iterator[bytes]:
+    """
+    Yields the raw lines of a JSONL file (without the trailing newline).
+    Maps the file read-only and scans for newlines with mmap.find, which avoids
+    buffered readline and the per-line str decode.
+    """
+    with open(path, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped
+            return
+        with mm:
+            # Sequential read-ahead hint; not available on Windows
+            if hasattr(mmap, "MADV_SEQUENTIAL"):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            size = len(mm)
+            start = 0
+            while start < size:
+                nl = mm.find(b"\n", start)
+                if nl == -1:
+                    nl = size
+                yield mm[start:nl]
+                start = nl + 1
+
+
+def latest_jsonl(directory: str, prefix: str, exclude: Optional[str] = None) -> Optional[str]:
+    """
+    Returns the most recently modified `<prefix>*.jsonl` in directory, or None.
+    Uses one os.scandir pass so each file is stat'ed once (not once per sort comparison).
+    """
+    if not os.path.isdir(directory):
+        return None
+    entries = []
+    with os.scandir(directory) as it:
+        for entry in it:
+            name = entry.name
+            if not (name.startswith(prefix) and name.endswith(".jsonl")):
+                continue
+            if exclude and exclude in name:
+                continue
+            entries.append((entry.stat().st_mtime, entry.path))
+    if not entries:
+        return None
+    return max(entries)[1]
+
+
+class JsonlWriter:
+    """
+    Appends encoded JSONL lines (bytes, no newline) from many coroutines through one
+    background task. Producers `await put(line)`; the drain task writes up to `batch_size` queued lines
+    per write (off the event loop) and flushes at most every `flush_interval` seconds
+    or when idle. `on_flush(size)` runs after a flush that left nothing queued, i.e.
+    when everything handed to the writer is on disk.
+    """
+
+    def __init__(self, path: str, batch_size: int = 512, flush_interval: float = 1.0,
+                 maxsize: int = 10000, on_flush: Optional[Callable[[int], None]] = None):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.on_flush = on_flush
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self._fh = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._fh = open(self.path, "ab", buffering=1 << 20)
+        self._task = asyncio.create_task(self._drain())
+
+    async def put(self, line: bytes):
+        if self._task.done():
+            # Nothing would ever drain the queue again; fail instead of blocking forever
+            raise RuntimeError(f"JsonlWriter for {self.path} is not running")
+        await self.queue.put(line)
+
+    def _write(self, lines: List[bytes]):
+        self._fh.write(b"\n".join(lines) + b"\n")
+
+    def _flush(self) -> int:
+        self._fh.flush()
+        return self._fh.tell()
+
+    async def _drain(self):
+        loop = asyncio.get_running_loop()
+        dirty = False
+        last_flush = loop.time()
+        while True:
+            try:
+                line = await asyncio.wait_for(self.queue.get(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                line = None
+            if line is not None:
+                buf = [line]
+                while len(buf) < self.batch_size and not self.queue.empty():
+                    buf.append(self.queue.get_nowait())
+                try:
+                    await asyncio.to_thread(self._write, buf)
+                    dirty = True
+                except Exception as e:
+                    # e.g. ENOSPC: this batch is lost, but the writer keeps draining
+                    logger.error(f"Failed to write {len(buf)} lines to {self.path}: {e}")
+                finally:
+                    for _ in buf:
+                        self.queue.task_done()
+
+            if dirty and (line is None or loop.time() - last_flush >= self.flush_interval):
+                dirty = False
+                last_flush = loop.time()
+                try:
+                    size = await asyncio.to_thread(self._flush)
+                    if self.on_flush and self.queue.empty():
+                        self.on_flush(size)
+                except Exception as e:
+                    logger.error(f"Failed to flush {self.path}: {e}")
+
+    async def close(self):
+        """
+        Waits for queued lines, then flushes, fsyncs and closes the file.
+        Re-raises the error if the drain task died, instead of waiting on the queue forever.
+        """
+        join = asyncio.ensure_future(self.queue.join())
+        await asyncio.wait({join, self._task}, return_when=asyncio.FIRST_COMPLETED)
+        join.cancel()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        except Exception:
+            await asyncio.to_thread(self._sync_close)
+            raise
+        # fsync can take a while on slow disks; keep it off the event loop too
+        size = await asyncio.to_thread(self._sync_close)
+        if self.on_flush:
+            self.on_flush(size)
+
+    def _sync_close(self) -> int:
+        self._fh.flush()
+        os.fsync(self._fh.fileno())
+        size = self._fh.tell()
+        self._fh.close()
+        return size
@@ -1,10 +1,24 @@
 import os
 import sys
+import time
 import logging
 from contextlib import contextmanager
 
+try:
+    import fcntl  # POSIX only
+except ImportError:
+    fcntl = None
+
 logger = logging.getLogger(__name__)
 
+# Win32 constants for RunLock.is_process_running
+PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+STILL_ACTIVE = 259
+ERROR_INVALID_PARAMETER = 87  # OpenProcess: no process with that PID
+# An empty lock file usually belongs to a run that has just created it and not yet written its PID
+EMPTY_LOCK_RETRIES = 10
+EMPTY_LOCK_DELAY = 0.1  # seconds between looks at an empty lock file
+
 class RunLock:
     """
     Prevent concurrent executions using a file lock with PID.
@@ -15,59 +29,143 @@ class RunLock:
     @contextmanager
     def acquire(self):
         """Try to acquire the lock. Raises RuntimeError if locked."""
-        if os.path.exists(self.lock_file):
-            # Check if valid
+        fd = None
+        # Second attempt only after a stale lock file was removed
+        for _ in range(2):
             try:
-                with open(self.lock_file, "r") as f:
-                    content = f.read().strip()
-                
-                if content:
-                    pid = int(content)
-                    if self.is_process_running(pid):
-                        raise RuntimeError(f"Lock file exists. Process {pid} is running.")
-                    else:
-                        logger.warning(f"Found stale lock file from PID {pid}. Overwriting.")
-            except ValueError:
-                logger.warning("Invalid lock file content. Overwriting.")
-            except IOError:
-                pass # Can't read, maybe race?
-                
-        # Write Lock
+                # Atomic create: fails if the file exists, so no exists()/open() race
+                fd = os.open(self.lock_file, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+                break
+            except FileExistsError:
+                self._check_stale()
+            except OSError as e:
+                raise RuntimeError(f"Failed to write lock file: {e}")
+        if fd is None:
+            raise RuntimeError(f"Lock file exists: {self.lock_file}")
+
         try:
-            with open(self.lock_file, "w") as f:
-                f.write(str(os.getpid()))
+            if fcntl is not None:
+                # Held for the whole run; the kernel drops it if the process dies.
+                # Blocking: the file is new, so only a _check_stale probe can hold it, and only briefly.
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            os.write(fd, str(os.getpid()).encode())
             logger.info(f"Acquired lock: {self.lock_file} (PID {os.getpid()})")
-        except IOError as e:
+        except OSError as e:
+            os.close(fd)
+            os.remove(self.lock_file)
             raise RuntimeError(f"Failed to write lock file: {e}")
             
         try:
             yield
         finally:
-            # Release Lock
-            if os.path.exists(self.lock_file):
-                try:
-                    os.remove(self.lock_file)
-                    logger.info("Released lock.")
-                except OSError as e:
-                    logger.error(f"Failed to remove lock file: {e}")
+            # Release Lock. POSIX: unlink while the flock is still held, then close.
+            # Windows: an open file cannot be deleted, so close first.
+            if fcntl is None:
+                os.close(fd)
+            try:
+                os.remove(self.lock_file)
+                logger.info("Released lock.")
+            except OSError as e:
+                logger.error(f"Failed to remove lock file: {e}")
+            finally:
+                if fcntl is not None:
+                    os.close(fd)
+
+    def _check_stale(self):
+        """Raises RuntimeError if the existing lock is held; otherwise removes the stale file."""
+        for attempt in range(EMPTY_LOCK_RETRIES + 1):
+            try:
+                probe = os.open(self.lock_file, os.O_RDONLY)
+            except FileNotFoundError:
+                return  # Released meanwhile
+            stale = False
+            try:
+                if fcntl is not None:
+                    # A live holder keeps an flock on the file; if we can take it, the holder is gone
+                    try:
+                        fcntl.flock(probe, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except BlockingIOError:
+                        raise RuntimeError("Lock file exists and is held by a running process.")
+                identity = self._identity(os.fstat(probe))
+                content = self._read_all(probe).strip()
+                if content:
+                    try:
+                        pid = int(content)
+                    except ValueError:
+                        logger.warning("Invalid lock file content. Overwriting.")
+                    else:
+                        if self.is_process_running(pid):
+                            raise RuntimeError(f"Lock file exists. Process {pid} is running.")
+                        logger.warning(f"Found stale lock file from PID {pid}. Overwriting.")
+                    stale = True
+                elif attempt == EMPTY_LOCK_RETRIES:
+                    # Still empty after the grace period: its creator died before writing a PID
+                    logger.warning("Empty lock file. Overwriting.")
+                    stale = True
+                if stale and fcntl is not None:
+                    # Removed while the probe flock is still held, so no new holder can have it
+                    self._remove_if_same(identity)
+            finally:
+                os.close(probe)
+            if stale:
+                if fcntl is None:
+                    # Windows cannot delete a file that is still open
+                    self._remove_if_same(identity)
+                return
+            # Empty: most likely a run between creating the file and locking/writing it
+            time.sleep(EMPTY_LOCK_DELAY)
+
+    @staticmethod
+    def _identity(st: os.stat_result):
+        return st.st_dev, st.st_ino
+
+    @staticmethod
+    def _read_all(fd: int) -> bytes:
+        chunks = []
+        while True:
+            chunk = os.read(fd, 4096)
+            if not chunk:
+                return b"".join(chunks)
+            chunks.append(chunk)
+
+    def _remove_if_same(self, identity):
+        """Removes the lock file only if it is still the file we inspected (not a newer run's lock)."""
+        try:
+            if self._identity(os.stat(self.lock_file)) != identity:
+                return  # Replaced by another process meanwhile
+            os.remove(self.lock_file)
+        except FileNotFoundError:
+            return  # Another process cleaned it up first
                     
     @staticmethod
     def is_process_running(pid: int) -> bool:
         """Check if PID is running (Cross-platform basic check)."""
         if os.name == 'nt':
-            # Windows
+            # Windows: query the process handle directly instead of spawning tasklist
+            import ctypes
+            from ctypes import wintypes
+            k32 = ctypes.WinDLL("kernel32", use_last_error=True)
+            # HANDLE is pointer-sized; the default int restype would truncate it on 64-bit
+            k32.OpenProcess.restype = wintypes.HANDLE
+            k32.OpenProcess.argtypes = (wintypes.DWORD, wintypes.BOOL, wintypes.DWORD)
+            handle = k32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+            if not handle:
+                # Only a bad PID means it is gone; access denied (another user's or a
+                # protected process) and other failures mean it exists, so keep the lock
+                return ctypes.get_last_error() != ERROR_INVALID_PARAMETER
             try:
-                # Use tasklist to check PID presence
-                import subprocess
-                cmd = f"tasklist /FI \"PID eq {pid}\""
-                output = subprocess.check_output(cmd, shell=True).decode()
-                return str(pid) in output
-            except:
-                return False # Assume not running if check fails
+                exit_code = ctypes.c_ulong()
+                if not k32.GetExitCodeProcess(handle, ctypes.byref(exit_code)):
+                    return True  # We hold a handle, so the process exists
+                return exit_code.value == STILL_ACTIVE
+            finally:
+                k32.CloseHandle(handle)
         else:
             # POSIX
             try:
                 os.kill(pid, 0)
                 return True
+            except PermissionError:
+                return True  # Exists, owned by another user
             except OSError:
                 return False
@@ -3,6 +3,7 @@ import os
 import asyncio
 import argparse
 import logging
+import dataclasses
 from datetime import datetime, timezone, timedelta
 from typing import Optional, Dict, Any
 
@@ -67,7 +68,8 @@ async def run_pipeline(headless: Optional[bool] = True, run_id: Optional[str] =
 
     # Allow callers to override headless mode dynamically
     if headless is not None:
-        cfg.crawler.headless = bool(headless)
+        cfg = dataclasses.replace(cfg, crawler=dataclasses.replace(cfg.crawler, headless=bool(headless)))
+        config_module.config = cfg
 
     run_id = run_id or datetime.now().strftime("%Y%m%d_%H%M%S")
     setup_logging(run_id)
@@ -105,32 +107,22 @@ async def run_pipeline(headless: Optional[bool] = True, run_id: Optional[str] =
             reporter = ReportGenerator(run_id)
 
             # Run pipeline
-            articles, comments = await crawler.run()
-
-            # Post-process: Add Metadata
+            # Records are saved incrementally by the crawler (with run_id/collected_at_kst);
+            # run() only returns how many were written
+            n_articles, n_comments = await crawler.run()
             collected_at = get_kst_time()
 
-            for art in articles:
-                art["run_id"] = run_id
-                art["collected_at_kst"] = collected_at
-
-            for cmt in comments:
-                cmt["run_id"] = run_id
-
-            # Export (Saved incrementally by crawler, so we don't need bulk export here)
-            # exporter.export_articles(articles)
-            # exporter.export_comments(comments)
-
             # Report
             reporter.set_stats(crawler.stats)
-            report_path = reporter.generate()
+            # File write stays off the event loop
+            report_path = await asyncio.to_thread(reporter.generate)
 
             logger.info("Pipeline completed successfully.")
 
             return {
                 "run_id": run_id,
-                "articles": len(articles),
-                "comments": len(comments),
+                "articles": n_articles,
+                "comments": n_comments,
                 "stats": crawler.stats,
                 "report_path": report_path,
                 "collected_at_kst": collected_at,
@@ -156,7 +148,13 @@ def cli():
     args = parser.parse_args()
 
     try:
-        asyncio.run(run_pipeline(headless=args.headless, config_path=args.config))
+        # uvloop is optional (not available on Windows, which keeps the Proactor policy above)
+        try:
+            import uvloop
+        except ImportError:
+            asyncio.run(run_pipeline(headless=args.headless, config_path=args.config))
+        else:
+            uvloop.run(run_pipeline(headless=args.headless, config_path=args.config))
     except Exception:
         # Let logging capture full traceback, but ensure non-zero exit for CLI callers
         logging.exception("Fatal error in main pipeline")
@@ -1,14 +1,19 @@
-import json
 import os
+import orjson
 import time
 from typing import Dict, Any
 
 class StatusMonitor:
     """
     Writes status.json to the run directory for monitoring.
+    Writes are coalesced: at most one per `min_interval` seconds, except stage
+    changes, which are written immediately. Call flush() to write the final state.
     """
-    def __init__(self, run_dir: str):
+    def __init__(self, run_dir: str, min_interval: float = 0.25):
         self.status_file = os.path.join(run_dir, "status.json")
+        self.min_interval = min_interval
+        self._dirty = False
+        self._last_flush = float("-inf")
         self.status = {
             "stage": "INIT",
             "last_updated": time.time(),
@@ -17,7 +22,7 @@ class StatusMonitor:
             "collected": 0,
             "errors_count": 0
         }
-        self.update()
+        self.update(force=True)
 
     def update_stats(self, crawler_stats: Dict[str, Any]):
         """Update from crawler stats object."""
@@ -27,17 +32,40 @@ class StatusMonitor:
         self.update()
 
     def set_stage(self, stage: str):
+        changed = self.status["stage"] != stage
         self.status["stage"] = stage
-        self.update()
+        self.update(force=changed)
         
     def set_keyword(self, keyword: str):
         self.status["keyword"] = keyword
         self.update()
 
-    def update(self):
+    def update(self, force: bool = False):
         self.status["last_updated"] = time.time()
+        now = time.monotonic()
+        if not force and now - self._last_flush < self.min_interval:
+            self._dirty = True
+            return
+        self._write()
+        self._last_flush = now
+
+    def flush(self):
+        """Writes the latest status if an update was coalesced since the last write."""
+        if self._dirty:
+            self._write()
+            self._last_flush = time.monotonic()
+
+    def _write(self):
+        self._dirty = False
+        tmp_path = self.status_file + ".tmp"
         try:
-            with open(self.status_file, "w", encoding="utf-8") as f:
-                json.dump(self.status, f, ensure_ascii=False, indent=2)
+            data = orjson.dumps(self.status, option=orjson.OPT_INDENT_2)
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                os.write(fd, data)
+            finally:
+                os.close(fd)
+            # Atomic swap: readers never see a half-written file
+            os.replace(tmp_path, self.status_file)
         except Exception:
             pass # Non-critical
@@ -1,25 +1,141 @@
 import re
-import json
+import math
+import orjson
 import asyncio
+import contextlib
 import aiohttp
 import requests
+from requests.adapters import HTTPAdapter
 import logging
+from dataclasses import dataclass
 from typing import List, Dict, Optional, Any, Tuple
 from urllib.parse import urlencode
-from bs4 import BeautifulSoup
+from selectolax.lexbor import LexborHTMLParser
+try:
+    import httpx  # optional: only for comment_api_transport="httpx" (pip install "httpx[http2]")
+except ImportError:
+    httpx = None
 from playwright.async_api import Page
 from .selectors import SearchPageSelectors, ArticlePageSelectors, DemographicSelectors
 from .config import config
 
 logger = logging.getLogger(__name__)
 
-async def parse_search_results(page: Page) -> List[Dict[str, str]]:
+# Compiled once; these run per search item / per article
+_OID_AID_RE = re.compile(r"article/(\d+)/(\d+)")
+_OID_RE = re.compile(r"oid=(\d+)")
+_AID_RE = re.compile(r"aid=(\d+)")
+_PCT_RE = re.compile(r"[\d.]+")
+
+COMMENT_PAGE_SIZE = 100
+SEARCH_PAGE_SIZE = 10  # results per search.naver.com page
+COMMENT_TEMPLATES = ("view_politics", "default_society", "default_economy", "default_view", "view_it")
+# oid -> templateId that last returned comments; tried first for that press's next articles.
+# Only touched from the event loop thread, so no lock.
+_template_by_oid: Dict[str, str] = {}
+
+# Shared requests session for the comment API: keep-alive connections are reused across
+# calls instead of a new TCP+TLS handshake per request. Created lazily, used from worker threads.
+_comment_http: Optional[requests.Session] = None
+
+
+def _get_comment_http() -> requests.Session:
+    global _comment_http
+    if _comment_http is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(10, config.crawler.page_sem))
+        session.mount("https://", adapter)
+        _comment_http = session
+    return _comment_http
+
+
+# HTTP/2 client for the comment API: many page requests multiplexed on one TLS connection.
+# Bound to the running event loop on first use; closed by close_comment_clients().
+_comment_http2 = None
+
+
+def _get_comment_http2():
+    global _comment_http2
+    if _comment_http2 is None:
+        if httpx is None:
+            raise RuntimeError('comment_api_transport="httpx" needs httpx[http2] installed')
+        limit = config.crawler.page_sem
+        _comment_http2 = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_connections=limit, max_keepalive_connections=limit),
+        )
+    return _comment_http2
+
+
+async def close_comment_clients():
+    """Closes the shared comment API clients (call once at the end of a run)."""
+    global _comment_http, _comment_http2
+    if _comment_http2 is not None:
+        await _comment_http2.aclose()
+        _comment_http2 = None
+    if _comment_http is not None:
+        _comment_http.close()
+        _comment_http = None
+
+
+@dataclass(slots=True, frozen=True)
+class Article:
+    """One search hit. Slotted: no per-instance dict for the many articles a run sees."""
+    url: str
+    title: str
+    date: str
+    oid: str
+    aid: str
+
+
+# Runs inside the search page with [itemSelector, naverNewsLinkSelector].
+# Per item: the visible "Naver News" link href, the title (a.news_tit, else the first long
+# non-"네이버뉴스" link text) and the date (.info_group .info, else a short span matching a date).
+SEARCH_RESULTS_JS = """([itemSel, linkSel]) => {
+    const visible = el => !!el && el.getClientRects().length > 0;
+    const datePattern = /(\\d{4}\\.\\d{2}\\.\\d{2}|\\d+(분|시간|일|주) 전)/;
+    const out = [];
+    for (const item of document.querySelectorAll(itemSel)) {
+        const link = item.querySelector(linkSel);
+        if (!visible(link)) continue;
+
+        let title = "No Title";
+        const titleEl = item.querySelector("a.news_tit");
+        if (visible(titleEl)) {
+            title = titleEl.textContent;
+        } else {
+            for (const a of item.querySelectorAll("a")) {
+                const txt = a.textContent;
+                if (txt && txt.length > 10 && !txt.includes("네이버뉴스")) { title = txt; break; }
+            }
+        }
+
+        let date = null;
+        for (const el of item.querySelectorAll(".info_group .info")) {
+            const txt = el.textContent;
+            if (txt && (txt.includes("전") || txt.includes(".")) && !txt.includes("네이버뉴스")) { date = txt.trim(); break; }
+        }
+        if (date === null) {
+            // New UI: scan generic spans (first 30) for date patterns
+            const spans = item.querySelectorAll("span");
+            for (let i = 0, n = Math.min(spans.length, 30); i < n; i++) {
+                const txt = spans[i].textContent;
+                if (txt && txt.length < 20 && datePattern.test(txt)) { date = txt.trim(); break; }
+            }
+        }
+        out.push({ href: link.getAttribute("href"), title: title || "", date: date || "Unknown Date" });
+    }
+    return out;
+}"""
+
+
+async def parse_search_results(page: Page) -> List[Article]:
     """
     Extracts 'Naver News' URLs and titles from the search results page.
-    Returns a list of dicts: {'url': str, 'title': str, 'oid': str, 'aid': str}
+    Returns a list of Article (url, title, date, oid, aid).
     """
     articles = []
-    seen = set()
+    seen = set()  # packed (oid, aid) keys, see _article_key
     
     # Wait for list to load
     try:
@@ -28,98 +144,65 @@ async def parse_search_results(page: Page) -> List[Dict[str, str]]:
         logger.warning("Search result list not found/visible.")
         return []
 
-    # Iterate over news items
-    items = await page.locator(SearchPageSelectors.NEWS_ITEM).all()
-    for item in items:
-        try:
-            # Check for "Naver News" link
-            naver_link = item.locator(SearchPageSelectors.NAVER_NEWS_LINK).first
-            if await naver_link.is_visible():
-                href = await naver_link.get_attribute("href")
-                
-                # Title - Try standard class, then fallback to finding the main article link
-                title_el = item.locator("a.news_tit").first
-                if not await title_el.is_visible():
-                    # Fallback: Find the link that is NOT the "Naver News" button but goes to naver news
-                    # Or simpler: The "Naver News" button usually points to the same article? 
-                    # No, "Naver News" button points to n.news.naver.com, title might point to original press.
-                    # Wait, we WANT n.news.naver.com article.
-                    # The "Naver News" button href IS the one we want to crawl.
-                    # So we can use that href.
-                    # Use the text of any large link in the item as title?
-                    # Let's try to get text from the 'Naver News' link itself? No, that says "네이버뉴스".
-                    # Let's try ".news_contents .news_tit" or similar.
-                    # New UI class seen in valid results: .yuu64AGiOBzaFbBUUZbL (dynamic)
-                    # Let's try generic: `a` tag with text length > 10?
-                    pass
-
-                title = await title_el.text_content() if await title_el.is_visible() else "No Title"
-                if title == "No Title":
-                     # Try to find the title link by exclusion
-                     links = await item.locator("a").all()
-                     for link in links:
-                         txt = await link.text_content()
-                         url = await link.get_attribute("href")
-                         # Title usually has long text
-                         if txt and len(txt) > 10 and "네이버뉴스" not in txt:
-                             title = txt
-                             break
-                
-                date_text = "Unknown Date"
-                try:
-                    # Try to find the date info (usually inside .info_group or .info)
-                    info_els = await item.locator(".info_group .info").all()
-                    found_date = False
-                    for el in info_els:
-                        txt = await el.text_content()
-                        if txt and ("전" in txt or "." in txt) and "네이버뉴스" not in txt:
-                            date_text = txt.strip()
-                            found_date = True
-                            break
-                    
-                    # [Fallback] New UI: Scan generic spans for date patterns
-                    if not found_date:
-                        date_pattern = re.compile(r"(\d{4}\.\d{2}\.\d{2}|\d+(분|시간|일|주) 전)")
-                        # Limit to first 30 elements to avoid performance hit
-                        spans = await item.locator("span").all()
-                        for sp in spans[:30]:
-                            txt = await sp.text_content()
-                            if txt and len(txt) < 20 and date_pattern.search(txt):
-                                date_text = txt.strip()
-                                break
-                except:
-                    pass
-
-                if href:
-                    oid, aid = extract_oid_aid(href)
-                    if oid and aid:
-                        clean_link = f"https://n.news.naver.com/mnews/article/{oid}/{aid}"
-                        if clean_link not in seen:
-                            seen.add(clean_link)
-                            articles.append({
-                                "url": clean_link,
-                                "title": title.strip(),
-                                "date": date_text,
-                                "oid": oid,
-                                "aid": aid
-                            })
-        except Exception as e:
+    # One round trip: the page walks every item and returns plain {href, title, date} rows
+    try:
+        rows = await page.evaluate(
+            SEARCH_RESULTS_JS, [SearchPageSelectors.NEWS_ITEM, SearchPageSelectors.NAVER_NEWS_LINK]
+        )
+    except Exception as e:
+        logger.warning(f"Search result scan failed: {e}")
+        return []
+
+    for row in rows:
+        href = row.get("href")
+        if not href:
             continue
+        oid, aid = extract_oid_aid(href)
+        if oid and aid:
+            key = _article_key(oid, aid)
+            if key not in seen:
+                seen.add(key)
+                articles.append(Article(
+                    url=f"https://n.news.naver.com/mnews/article/{oid}/{aid}",
+                    title=row["title"].strip(),
+                    date=row["date"],
+                    oid=oid,
+                    aid=aid,
+                ))
             
     return articles
 
+def _article_key(oid: str, aid: str) -> int:
+    """(oid, aid) packed into one int for dedup sets; aids are at most 10 digits."""
+    return int(oid) * 10_000_000_000 + int(aid)
+
 def extract_oid_aid(url: str) -> (Optional[str], Optional[str]):
     """
     Extracts oid and aid from a naver news URL.
     """
     # Pattern 1: .../article/001/0001234567
-    match = re.search(r"article/(\d+)/(\d+)", url)
+    # Fast path for the canonical form with plain str ops; anything unusual goes to the regex
+    i = url.find("/article/")
+    if i != -1:
+        rest = url[i + 9:]
+        j = rest.find("/")
+        if j > 0:
+            oid = rest[:j]
+            aid = rest[j + 1:]
+            for sep in "?#/":
+                k = aid.find(sep)
+                if k != -1:
+                    aid = aid[:k]
+            if oid.isdecimal() and aid.isdecimal():
+                return oid, aid
+
+    match = _OID_AID_RE.search(url)
     if match:
         return match.group(1), match.group(2)
     
     # Pattern 2: query params (less common in modern canonicals but possible)
-    match_oid = re.search(r"oid=(\d+)", url)
-    match_aid = re.search(r"aid=(\d+)", url)
+    match_oid = _OID_RE.search(url)
+    match_aid = _AID_RE.search(url)
     if match_oid and match_aid:
         return match_oid.group(1), match_aid.group(1)
         
@@ -130,14 +213,13 @@ async def parse_article_details(page: Page, url: str) -> Dict[str, Any]:
     Extracts title and comment count from the article page UI (as backup/verification).
     """
     title = ""
-    for sel in ArticlePageSelectors.TITLE:
-        if await page.locator(sel).first.is_visible():
-            title = await page.locator(sel).first.text_content()
-            break
+    # Union selector: the browser matches every title layout in one query
+    title_el = page.locator(ArticlePageSelectors.TITLE_UNION).first
+    if await title_el.is_visible():
+        title = await title_el.text_content() or ""
             
     # Comment count (UI) - useful to cross-check with API or if API fails
     comment_count = 0
-    comment_count = 0
     try:
         # Prioritize bottom comment area if present (lazy loaded)
         # Attempt to scroll to comment area first if not already done
@@ -146,18 +228,12 @@ async def parse_article_details(page: Page, url: str) -> Dict[str, Any]:
         except:
              pass
 
-        for sel in ArticlePageSelectors.COMMENT_COUNT:
-            try:
-                # Wait briefly for element to appear
-                el = page.locator(sel).first
-                if await el.is_visible(timeout=2000):
-                    text = await el.text_content()
-                    text = text.replace(",", "")
-                    if text.isdigit():
-                        comment_count = int(text)
-                        break
-            except:
-                continue
+        # Wait briefly for element to appear
+        el = page.locator(ArticlePageSelectors.COMMENT_COUNT_UNION).first
+        if await el.is_visible(timeout=2000):
+            text = (await el.text_content() or "").replace(",", "")
+            if text.isdigit():
+                comment_count = int(text)
     except:
         pass
 
@@ -167,14 +243,29 @@ async def parse_article_details(page: Page, url: str) -> Dict[str, Any]:
         "comment_count_ui": comment_count
     }
 
-def parse_jsonp_payload(text: str) -> Dict[str, Any]:
-    """Robust JSONP stripper without regex; tolerant to callback name changes/whitespace."""
-    start = text.find("(")
-    end = text.rfind(")")
+def _mk_comment(c: Dict[str, Any]) -> Dict[str, Any]:
+    """One API comment object as the row we store."""
+    get = c.get
+    return {
+        "comment_id": str(get("commentNo")),
+        "comment_text": get("contents", ""),
+        "comment_created_at": get("regTime", ""),
+        "author": get("maskedUserName", "") or get("userName", ""),
+        "sympathy_count": get("sympathyCount", 0),
+        "antipathy_count": get("antipathyCount", 0)
+    }
+
+def parse_jsonp_payload(body: bytes) -> Dict[str, Any]:
+    """
+    Robust JSONP stripper without regex; tolerant to callback name changes/whitespace.
+    Works on the raw response bytes; the payload is handed to orjson as a memoryview,
+    so it is neither decoded to str nor copied.
+    """
+    start = body.find(b"(")
+    end = body.rfind(b")")
     if start == -1 or end == -1 or end <= start:
         raise ValueError("Invalid JSONP wrapper")
-    payload = text[start + 1 : end]
-    return json.loads(payload)
+    return orjson.loads(memoryview(body)[start + 1 : end])
 
 
 async def fetch_comments_api(
@@ -207,10 +298,31 @@ async def fetch_comments_api(
     comments: List[Dict[str, Any]] = []
     meta: Dict[str, Any] = {"socialInfo": None, "total_count": 0}
 
+    transport = config.crawler.comment_api_transport
+
+    async def _fetch(params: Dict[str, Any]) -> Tuple[int, bytes]:
+        # Raw bytes on every path: orjson parses UTF-8 directly, so the text decode is skipped
+        if transport == "aiohttp":
+            # Shared keep-alive session from the crawler; no worker thread involved
+            async with session.get(base_url, params=params, headers=headers, timeout=timeout_obj) as resp:
+                return resp.status, await resp.read()
+        if transport == "httpx":
+            resp = await _get_comment_http2().get(base_url, params=params, headers=headers, timeout=timeout)
+            return resp.status_code, resp.content
+
+        # Use requests (sync) in a thread to mimic notebook behavior exactly
+        # This bypasses potential aiohttp TLS fingerprinting fail
+        def fetch_sync():
+            resp = _get_comment_http().get(base_url, params=params, headers=headers, timeout=timeout)
+            return resp.status_code, resp.content
+        return await asyncio.to_thread(fetch_sync)
+
     async def _request_page(page_num: int, initialize: bool) -> Dict[str, Any]:
         # Templates to try in order. If one returns >0 comments, we trust it.
         # If all return 0, we assume 0.
-        templates = ["view_politics", "default_society", "default_economy", "default_view", "view_it"]
+        # A template that already worked for this oid goes first, so later pages skip the probing.
+        known = _template_by_oid.get(oid)
+        templates = COMMENT_TEMPLATES if known is None else (known,) + tuple(t for t in COMMENT_TEMPLATES if t != known)
         
         best_payload = {}
         max_count = -1
@@ -223,7 +335,7 @@ async def fetch_comments_api(
                 "lang": "ko",
                 "country": "KR",
                 "objectId": object_id,
-                "pageSize": 100,
+                "pageSize": COMMENT_PAGE_SIZE,
                 "indexSize": 10,
                 "page": page_num,
                 "initialize": "true" if initialize else "false",
@@ -232,22 +344,11 @@ async def fetch_comments_api(
             }
             
             try:
-                # Use requests (sync) in a thread to mimic notebook behavior exactly
-                # This bypasses potential aiohttp TLS fingerprinting fail
-                def fetch_sync():
-                    return requests.get(base_url, params=params, headers=headers, timeout=timeout)
-                
-                if page_sem:
-                    async with page_sem:
-                        resp = await asyncio.to_thread(fetch_sync)
-                else:
-                    resp = await asyncio.to_thread(fetch_sync)
-
-                status = resp.status_code
-                text = resp.text
+                async with page_sem or contextlib.nullcontext():
+                    status, body = await _fetch(params)
                 
                 if status == 200:
-                    payload = parse_jsonp_payload(text)
+                    payload = parse_jsonp_payload(body)
                     
                     # Check count from this template
                     cnt = payload.get("result", {}).get("count", {}).get("comment", 0)
@@ -259,6 +360,7 @@ async def fetch_comments_api(
                     
                     # If we found significant comments, stop searching templates
                     if cnt > 0:
+                        _template_by_oid[oid] = tmpl
                         return best_payload
                         
                     # If 0, try next template
@@ -286,47 +388,33 @@ async def fetch_comments_api(
         meta["socialInfo"] = result.get("socialInfo")
         meta["total_count"] = result.get("count", {}).get("comment", 0)
 
-        comment_list = result.get("commentList", [])
-        for c in comment_list:
-            if len(comments) >= max_comments:
-                break
-            comments.append({
-                "comment_id": str(c.get("commentNo")),
-                "comment_text": c.get("contents", ""),
-                "comment_created_at": c.get("regTime", ""),
-                "author": c.get("maskedUserName", "") or c.get("userName", ""),
-                "sympathy_count": c.get("sympathyCount", 0),
-                "antipathy_count": c.get("antipathyCount", 0)
-            })
+        comments.extend(map(_mk_comment, result.get("commentList", [])[:max_comments]))
 
         page_model = result.get("pageModel", {})
         total_pages = page_model.get("totalPages", 0)
 
         if total_pages > 1 and len(comments) < max_comments:
-            tasks = []
-            for page_num in range(2, total_pages + 1):
-                if len(comments) >= max_comments:
-                    break
-                tasks.append(_request_page(page_num, False))
-
-            if tasks:
-                payloads = await asyncio.gather(*tasks, return_exceptions=True)
-                for payload in payloads:
-                    if isinstance(payload, Exception):
+            # Only the pages that can still contribute to max_comments are requested
+            needed_pages = min(total_pages, 1 + math.ceil((max_comments - len(comments)) / COMMENT_PAGE_SIZE))
+            tasks = [asyncio.create_task(_request_page(page_num, False)) for page_num in range(2, needed_pages + 1)]
+            try:
+                # Consumed in page order (comment order matters); stop as soon as the limit is reached
+                for task in tasks:
+                    if len(comments) >= max_comments:
+                        break
+                    try:
+                        payload = await task
+                    except Exception:
                         # Already logged
                         continue
                     result = payload.get("result", {})
-                    for c in result.get("commentList", []):
-                        if len(comments) >= max_comments:
-                            break
-                        comments.append({
-                            "comment_id": str(c.get("commentNo")),
-                            "comment_text": c.get("contents", ""),
-                            "comment_created_at": c.get("regTime", ""),
-                            "author": c.get("maskedUserName", "") or c.get("userName", ""),
-                            "sympathy_count": c.get("sympathyCount", 0),
-                            "antipathy_count": c.get("antipathyCount", 0)
-                        })
+                    remaining = max_comments - len(comments)
+                    comments.extend(map(_mk_comment, result.get("commentList", [])[:remaining]))
+            finally:
+                for task in tasks:
+                    task.cancel()
+                # Collect cancellations/errors of pages that were not consumed
+                await asyncio.gather(*tasks, return_exceptions=True)
     finally:
         if local_session and session:
             await session.close()
@@ -334,12 +422,12 @@ async def fetch_comments_api(
     return comments, meta
 
 
-async def fetch_search_results_http(session: aiohttp.ClientSession, keyword: str, page_idx: int) -> List[Dict[str, str]]:
+async def fetch_search_results_http(session: aiohttp.ClientSession, keyword: str, page_idx: int) -> List[Article]:
     """
     Fast HTML fetch for search results (no browser).
-    Returns list of article dicts.
+    Returns list of Article.
     """
-    start = page_idx * 10 + 1
+    start = page_idx * SEARCH_PAGE_SIZE + 1
     params = {
         "where": "news",
         "query": keyword,
@@ -347,57 +435,92 @@ async def fetch_search_results_http(session: aiohttp.ClientSession, keyword: str
         "start": start,
     }
     url = f"https://search.naver.com/search.naver?{urlencode(params)}"
-    resp = await session.get(url)
-    if resp.status != 200:
-        logger.warning(f"Search HTTP status {resp.status} page {page_idx+1}")
-        return []
-    html = await resp.text()
-    soup = BeautifulSoup(html, "html.parser")
+    async with session.get(url) as resp:
+        if resp.status != 200:
+            logger.warning(f"Search HTTP status {resp.status} page {page_idx+1}")
+            return []
+        # Raw bytes: lexbor parses UTF-8 itself, no intermediate str
+        html = await resp.read()
+    # selectolax lexbor (C parser) + CSS matching instead of BeautifulSoup's pure-Python html.parser
+    tree = LexborHTMLParser(html)
     articles = []
-    seen = set()
+    seen = set()  # packed (oid, aid) keys, see _article_key
+    # Scope the link scan to the result list when present (skips header/sidebar/ad markup)
+    root = tree.css_first(SearchPageSelectors.NEWS_LIST_WRAPPER) or tree
     # Look for direct Naver News links
-    for a in soup.find_all("a", href=True):
-        href = a["href"]
-        if "n.news.naver.com" not in href:
+    for a in root.css(SearchPageSelectors.NAVER_NEWS_LINK):
+        if len(articles) >= SEARCH_PAGE_SIZE:
+            break
+        href = a.attributes.get("href")
+        if not href:
             continue
         oid, aid = extract_oid_aid(href)
         if not (oid and aid):
             continue
-        clean_link = f"https://n.news.naver.com/mnews/article/{oid}/{aid}"
-        if clean_link in seen:
+        key = _article_key(oid, aid)
+        if key in seen:
             continue
-        title = a.get_text(strip=True) or "No Title"
+        title = a.text(strip=True) or "No Title"
         # Try nearby title anchor
-        parent = a.find_parent()
+        parent = a.parent
         if parent:
-            title_candidate = parent.find("a", class_="news_tit")
-            if title_candidate and title_candidate.get_text(strip=True):
-                title = title_candidate.get_text(strip=True)
+            title_candidate = parent.css_first("a.news_tit")
+            if title_candidate and title_candidate.text(strip=True):
+                title = title_candidate.text(strip=True)
         # Try to find date in .info_group .info
         date_text = "Unknown Date"
-        try:
-            parent = a.find_parent("div", class_="news_area")
-            if parent:
-                infos = parent.select(".info_group .info")
-                for info in infos:
-                    txt = info.get_text(strip=True)
-                    if ("전" in txt or "." in txt) and "네이버뉴스" not in txt:
-                        date_text = txt
-                        break
-        except:
-             pass
+        area = _find_ancestor(a, "div", "news_area")
+        if area:
+            for info in area.css(".info_group .info"):
+                txt = info.text(strip=True)
+                if ("전" in txt or "." in txt) and "네이버뉴스" not in txt:
+                    date_text = txt
+                    break
 
-        seen.add(clean_link)
-        articles.append({
-            "url": clean_link,
-            "title": title,
-            "date": date_text,
-            "oid": oid,
-            "aid": aid
-        })
+        seen.add(key)
+        articles.append(Article(
+            url=f"https://n.news.naver.com/mnews/article/{oid}/{aid}",
+            title=title,
+            date=date_text,
+            oid=oid,
+            aid=aid,
+        ))
 
     return articles
 
+def _find_ancestor(node, tag: str, cls: str):
+    """Closest ancestor <tag> whose class list contains cls, or None."""
+    node = node.parent
+    while node is not None:
+        if node.tag == tag and cls in (node.attributes.get("class") or "").split():
+            return node
+        node = node.parent
+    return None
+
+# Runs inside the article page: text of the first visible match per selector list, else null
+DEMOGRAPHICS_JS = """(sels) => {
+    const first = list => {
+        for (const sel of list) {
+            const el = document.querySelector(sel);
+            if (el && el.getClientRects().length > 0) return el.textContent;
+        }
+        return null;
+    };
+    return { male: first(sels.male), female: first(sels.female), ages: sels.ages.map(sel => first([sel])) };
+}"""
+_DEMOGRAPHIC_SELS = {
+    "male": DemographicSelectors.MALE_RATIO,
+    "female": DemographicSelectors.FEMALE_RATIO,
+    "ages": DemographicSelectors.AGE_ITEMS,
+}
+
+def _parse_pct(txt: str) -> float:
+    """'37.5%' -> 37.5. Raises ValueError when the text holds no number."""
+    match = _PCT_RE.search(txt or "")
+    if not match:
+        raise ValueError(f"no percentage in {txt!r}")
+    return float(match.group())
+
 async def parse_demographics(page: Page) -> Dict[str, Any]:
     """
     Extracts gender and age distribution.
@@ -441,34 +564,19 @@ async def parse_demographics(page: Page) -> Dict[str, Any]:
         return data
 
     try:
+        # All chart texts in one round trip (None where the element is missing/hidden)
+        texts = await page.evaluate(DEMOGRAPHICS_JS, _DEMOGRAPHIC_SELS)
+
         # Gender
-        for sel in DemographicSelectors.MALE_RATIO:
-            if await page.locator(sel).first.is_visible():
-                txt = await page.locator(sel).first.text_content()
-                data["male_ratio"] = float(txt.replace("%", "").strip())
-                break
-                
-        for sel in DemographicSelectors.FEMALE_RATIO:
-            if await page.locator(sel).first.is_visible():
-                txt = await page.locator(sel).first.text_content()
-                data["female_ratio"] = float(txt.replace("%", "").strip())
-                break
+        if texts["male"] is not None:
+            data["male_ratio"] = _parse_pct(texts["male"])
+        if texts["female"] is not None:
+            data["female_ratio"] = _parse_pct(texts["female"])
         
         # Age
-        age_keys = ["age_10s", "age_20s", "age_30s", "age_40s", "age_50s", "age_60_plus"]
-        # New selectors are specific per age group, so we iterate them
         # Note: Selector list has 7 items now (including 70s).
-        # We will map them to our stored keys. 60+ will aggregate 60s and 70s if we want, or just take 60s?
-        # Original requirement: 6 buckets. So maybe sum 60s and 70s? or just store what we have.
-        # Let's read them all first.
-        
-        age_values = []
-        for sel in DemographicSelectors.AGE_ITEMS:
-            if await page.locator(sel).first.is_visible():
-                 txt = await page.locator(sel).first.text_content()
-                 age_values.append(float(txt.replace("%", "").strip()))
-            else:
-                 age_values.append(0.0)
+        # Original requirement: 6 buckets, so 60s and 70s are summed into age_60_plus below.
+        age_values = [_parse_pct(txt) if txt is not None else 0.0 for txt in texts["ages"]]
                  
         if len(age_values) >= 6:
             data["age_10s"] = age_values[0]
@@ -0,0 +1,64 @@
+import time
+import asyncio
+import logging
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Async token bucket shared by all workers: at most `rate` acquisitions per second,
+    with bursts up to `capacity`. Use as `async with bucket:` before each request.
+    `backoff()` lowers the rate and pauses every caller, for block/CAPTCHA responses;
+    `success()` clears the strike count and lets the rate climb back to its initial value.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None,
+                 backoff_base: float = 2.0, min_rate: float = 0.1):
+        self.rate = rate
+        self.max_rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.backoff_base = backoff_base
+        self.min_rate = min_rate
+        self.strikes = 0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._resume_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        # The lock queues callers in order, so one waiter sleeps at a time
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._resume_at:
+                    await asyncio.sleep(self._resume_at - now)
+                    continue
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+    def backoff(self):
+        """Halves the rate and pauses all callers for backoff_base * 2**strikes seconds."""
+        delay = self.backoff_base * (2 ** min(self.strikes, 5))
+        self.strikes += 1
+        self.rate = max(self.min_rate, self.rate / 2)
+        self._resume_at = max(self._resume_at, time.monotonic() + delay)
+        logger.warning(f"Backing off {delay:.1f}s; request rate now {self.rate:.2f}/s")
+
+    def success(self):
+        """A request went through: reset strikes and recover 10% of the original rate."""
+        self.strikes = 0
+        if self.rate < self.max_rate:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * 0.1)
@@ -1,4 +1,4 @@
-import json
+import orjson
 import os
 import logging
 from typing import Dict, Any, List
@@ -19,7 +19,7 @@ class ReportGenerator:
         self.stats = stats
         
     def generate(self):
-        """Create and save the run report."""
+        """Create and save the run report. Blocking file I/O; async callers run it via asyncio.to_thread."""
         end_time = datetime.now()
         duration = (end_time - self.start_time).total_seconds()
         
@@ -39,13 +39,13 @@ class ReportGenerator:
         # Save to logs dir
         filename = f"summary_{self.run_id}.json"
         log_dir = "logs"
-        if not os.path.exists(log_dir):
-            os.makedirs(log_dir, exist_ok=True)
+        os.makedirs(log_dir, exist_ok=True)
             
         path = os.path.join(log_dir, filename)
         
-        with open(path, 'w', encoding='utf-8') as f:
-            json.dump(report, f, ensure_ascii=False, indent=2)
+        # orjson emits UTF-8 directly (same output as ensure_ascii=False, indent=2)
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(report, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
             
         logger.info(f"Run summary saved to {path}")
         return path
@@ -31,6 +31,8 @@ class ArticlePageSelectors:
         "div.article_info h3",       # Old layout
         ".end_tit"                   # Very old layout
     ]
+    # All title layouts in one selector: one lookup instead of one per layout
+    TITLE_UNION = ":is(" + ", ".join(TITLE) + ")"
     
     # Canonical link often found in head > link[rel='canonical']
     # But for extraction from body if needed:
@@ -44,6 +46,7 @@ class ArticlePageSelectors:
         "a.media_end_head_info_datestamp_bunch span.u_cbox_count",
         "div.u_cbox_area span.u_cbox_count"
     ]
+    COMMENT_COUNT_UNION = ":is(" + ", ".join(COMMENT_COUNT) + ")"
     
     # Content area (if we needed body text, but we don't for this task)
     BODY = ["#dic_area", "#articleBodyContents"]
@@ -1,11 +1,17 @@
-import json
 import os
+import orjson
 import logging
 from typing import List, Dict, Any
 from . import config as config_module
 
 logger = logging.getLogger(__name__)
 
+
+def dumps_line(row: Dict[str, Any]) -> bytes:
+    """One JSONL record as UTF-8 bytes, trailing newline included."""
+    return orjson.dumps(row, option=orjson.OPT_NON_STR_KEYS) + b"\n"
+
+
 class CSVExporter:
     """Handles exporting data to CSV files."""
     
@@ -42,6 +48,8 @@ class CSVExporter:
         self.comments_path = os.path.join(self.run_dir, config_module.config.storage.comments_filename)
         self.article_batch_idx = 0
         self.comment_batch_idx = 0
+        # Append handles stay open for the exporter's lifetime (opened on first use)
+        self._append_handles: Dict[str, Any] = {}
             
     def save_article(self, article: Dict[str, Any]):
         """Save a single article to JSONL immediately (Append)."""
@@ -49,15 +57,14 @@ class CSVExporter:
             return
             
         # Append to file
-        self._append_to_jsonl(article, self.articles_path)
+        self._append_to_jsonl([article], self.articles_path)
 
     def save_comments(self, comments: List[Dict[str, Any]]):
         """Save a batch of comments to JSONL immediately (Append)."""
         if not comments:
             return
             
-        for comment in comments:
-            self._append_to_jsonl(comment, self.comments_path)
+        self._append_to_jsonl(comments, self.comments_path)
 
     def save_articles_batch(self, articles: List[Dict[str, Any]]):
         """Crash-safe batch write using tmp -> replace. Creates unique batch files when enabled."""
@@ -75,15 +82,25 @@ class CSVExporter:
         filename = self._batch_filename(prefix="comments_batch", idx=self.comment_batch_idx)
         self._write_batch(comments, filename)
         
-    def _append_to_jsonl(self, data: Dict[str, Any], path: str):
-        """Helper to append data to JSONL."""
+    def _append_to_jsonl(self, rows: List[Dict[str, Any]], path: str):
+        """Helper to append rows to JSONL as one write on a long-lived buffered handle."""
         try:
-            with open(path, "a", encoding=config_module.config.storage.encoding) as f:
-                json.dump(data, f, ensure_ascii=False)
-                f.write("\n")
+            fh = self._append_handles.get(path)
+            if fh is None:
+                fh = self._append_handles[path] = open(path, "ab", buffering=1 << 20)
+            fh.write(b"".join([dumps_line(row) for row in rows]))
         except Exception as e:
             logger.error(f"Failed to save data to {path}: {e}")
 
+    def close(self):
+        """Flushes and closes the append handles. Safe to call more than once."""
+        for path, fh in self._append_handles.items():
+            try:
+                fh.close()
+            except OSError as e:
+                logger.error(f"Failed to close {path}: {e}")
+        self._append_handles.clear()
+
     def _batch_filename(self, prefix: str, idx: int) -> str:
         if config_module.config.storage.unique_batch_files:
             return os.path.join(self.run_dir, f"{prefix}_{self.run_id}_{idx:04d}_{self.pid}.jsonl")
@@ -92,10 +109,13 @@ class CSVExporter:
     def _write_batch(self, rows: List[Dict[str, Any]], final_path: str):
         tmp_path = final_path + config_module.config.storage.tmp_suffix
         try:
-            with open(tmp_path, "w", encoding=config_module.config.storage.encoding) as f:
-                for row in rows:
-                    json.dump(row, f, ensure_ascii=False)
-                    f.write("\n")
+            # Serialize the whole batch first, then a single write (large writes bypass the buffer)
+            data = b"".join([dumps_line(row) for row in rows])
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+                f.flush()
+                # Data must be on disk before the rename makes the batch visible
+                os.fsync(f.fileno())
             os.replace(tmp_path, final_path)
         except Exception as e:
             logger.error(f"Failed batch write to {final_path}: {e}")
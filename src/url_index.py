@@ -0,0 +1,110 @@
+import os
+import re
+import sqlite3
+import logging
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+# Top-level "url" value without escapes; anything else goes through orjson
+URL_RE = re.compile(rb'(?<!\\)"url"\s*:\s*"([^"\\]*)"')
+# Naver article ids: .../article/001/0001234567 or ?oid=001&aid=0001234567
+ARTICLE_PATH_RE = re.compile(r"/article/(?:comment/)?(\d+)/(\d+)")
+OID_RE = re.compile(r"[?&]oid=(\d+)")
+AID_RE = re.compile(r"[?&]aid=(\d+)")
+# Bump when canonical_key changes; an index built with another version is rebuilt
+KEY_VERSION = 2
+
+
+def canonical_key(url: str) -> str:
+    """
+    Dedup key for a news URL: 'oid/aid' for Naver articles regardless of host or URL
+    format (n.news / news.naver.com / sports / entertain), otherwise the URL itself.
+    """
+    m = ARTICLE_PATH_RE.search(url)
+    if m:
+        return f"{m.group(1)}/{m.group(2)}"
+    oid, aid = OID_RE.search(url), AID_RE.search(url)
+    if oid and aid:
+        return f"{oid.group(1)}/{aid.group(1)}"
+    return url
+
+
+def extract_url(line: bytes) -> str:
+    """URL of one JSONL record. Byte-level fast path, full parse as fallback."""
+    m = URL_RE.search(line)
+    if m:
+        return m.group(1).decode("utf-8")
+    return orjson.loads(line)["url"]
+
+
+class SeenUrlIndex:
+    """
+    Exact URL dedup backed by a sqlite table (url PRIMARY KEY) instead of an in-memory set.
+    Stores canonical_key(url), so one article reached through different URL forms counts once.
+    Remembers how many bytes of the source JSONL are indexed, so a restart only
+    ingests lines appended since the last commit.
+    The connection may be created on a worker thread (e.g. asyncio.to_thread) and used
+    from another afterwards; callers must not use it from two threads at once.
+    """
+
+    def __init__(self, db_path: str, jsonl_path: str):
+        self.jsonl_path = jsonl_path
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS seen (url TEXT PRIMARY KEY) WITHOUT ROWID")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER)")
+        self.sync()
+
+    def _meta(self, key: str) -> int:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else 0
+
+    def sync(self):
+        """Index lines of the JSONL that are not in the table yet."""
+        size = os.path.getsize(self.jsonl_path) if os.path.exists(self.jsonl_path) else 0
+        offset = self._meta("indexed_bytes")
+        if offset > size or self._meta("key_version") != KEY_VERSION:
+            # Source was truncated/replaced, or keys were built differently: rebuild from scratch
+            if offset:
+                logger.warning(f"Rebuilding seen index for {self.jsonl_path}.")
+            self.conn.execute("DELETE FROM seen")
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('key_version', ?)", (KEY_VERSION,)
+            )
+            offset = 0
+
+        if offset < size:
+            urls = []
+            with open(self.jsonl_path, "rb") as f:
+                f.seek(offset)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break  # Partial trailing line; pick it up once complete
+                    offset += len(line)
+                    try:
+                        urls.append((canonical_key(extract_url(line)),))
+                    except (orjson.JSONDecodeError, UnicodeDecodeError, KeyError, TypeError) as e:
+                        logger.warning(f"Skipping unreadable line in {self.jsonl_path}: {e}")
+            self.conn.executemany("INSERT OR IGNORE INTO seen (url) VALUES (?)", urls)
+
+        self.commit(offset)
+
+    def add(self, url: str) -> bool:
+        """Mark url as seen. Returns True if no URL with the same canonical key was seen before."""
+        cur = self.conn.execute("INSERT OR IGNORE INTO seen (url) VALUES (?)", (canonical_key(url),))
+        return cur.rowcount == 1
+
+    def commit(self, indexed_bytes: int):
+        """Persist pending adds together with the JSONL size they correspond to."""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('indexed_bytes', ?)", (indexed_bytes,)
+        )
+        self.conn.commit()
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+